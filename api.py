@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Fitness Assistant - API HTTP local (JSON) sobre el núcleo
+Ejecutar con: python api.py [--port 8502] [--workers 4]
+
+Endpoints:
+  GET  /health
+  POST /bmi              {"weight": 70, "height": 1.75}
+  POST /calories         {"activity", "intensity", "duration", "weight", "age", "sex", "height"}
+                         o {"sessions": [...]} para estimar muchas sesiones de una vez
+  POST /routines         {"type", "level", "duration", "seed"}
+  GET  /progress         ?user=&start=&end=&limit=&cursor=&order=&activity=&intensity=
+  GET  /progress/stats   ?user=&days=7
+  POST /progress         {"user", "sessions": [...]}
+  POST /batch            {"requests": [{"method": "POST", "path": "/calories", "body": {...}}, ...]}
+
+Los parámetros pueden ir en la query string o en el cuerpo JSON. Las
+conexiones son persistentes (HTTP/1.1 keep-alive) y con --workers N varios
+procesos comparten el puerto.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import signal
+import socket
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "src"))
+
+from config.settings import API_CONFIG, CATALOG_CONFIG, DATABASE_CONFIG, LOGGING_CONFIG, MET_VALUES
+from core import (DEFAULT_INTENSITY, DEFAULT_USER, LEVELS, WORKOUT_TYPES, DatabaseManager, MetModel, RoutineEngine,
+                  ShardIndex, bmi_category, calculate_bmi, ideal_weight, load_catalog, normalize_date,
+                  normalize_user_id, routine_volume)
+
+logger = logging.getLogger("fitness.api")
+
+REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+
+class ApiError(Exception):
+    """Error de la petición con su código HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(params, name, default=None, minimum=None, maximum=None):
+    value = params.get(name, default)
+    if value is None:
+        raise ApiError(400, f"Falta el campo '{name}'")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' debe ser numérico")
+    if not math.isfinite(value) or (minimum is not None and value < minimum) or (
+            maximum is not None and value > maximum):
+        raise ApiError(400, f"'{name}' fuera de rango [{minimum}, {maximum}]")
+    return value
+
+
+def _optional_number(params, name, minimum=None, maximum=None):
+    if params.get(name) is None:
+        return None
+    return _number(params, name, minimum=minimum, maximum=maximum)
+
+
+def _choice(params, name, options):
+    value = params.get(name)
+    if value not in options:
+        raise ApiError(400, f"'{name}' debe ser uno de: {', '.join(options)}")
+    return value
+
+
+def _calories(value):
+    return round(value, 1) if math.isfinite(value) else None
+
+
+class FitnessApi:
+    """Endpoints JSON sobre el núcleo, independientes del transporte HTTP.
+
+    Las operaciones sobre DatabaseManager (E/S y bloqueos) se ejecutan en el
+    pool de hilos del bucle para no bloquearlo; el resto son cálculos de
+    microsegundos y se resuelven en el propio bucle.
+    """
+
+    def __init__(self, shards_dir=None, legacy_file=None, max_users=None, max_batch=None):
+        self.catalog = load_catalog(CATALOG_CONFIG["file_path"])
+        self.routines = RoutineEngine(self.catalog)
+        self.model = MetModel(MET_VALUES)
+        self.shards = ShardIndex(shards_dir or DATABASE_CONFIG["shards_dir"], legacy_file=legacy_file)
+        self.max_users = max_users or DATABASE_CONFIG["max_cached_users"]
+        self.max_batch = max_batch or API_CONFIG["max_batch"]
+        self.databases = OrderedDict()
+        self.databases_lock = threading.Lock()
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/bmi"): self.bmi,
+            ("POST", "/calories"): self.calories,
+            ("POST", "/routines"): self.routine,
+            ("GET", "/progress"): self.in_thread(self.progress_page),
+            ("GET", "/progress/stats"): self.in_thread(self.progress_stats),
+            ("POST", "/progress"): self.in_thread(self.add_progress),
+            ("POST", "/batch"): self.batch
+        }
+
+    @staticmethod
+    def in_thread(handler):
+        async def run(params):
+            return await asyncio.get_running_loop().run_in_executor(None, handler, params)
+        return run
+
+    def database(self, user):
+        """DatabaseManager del usuario; se conservan los `max_users` más recientes"""
+        user_id = normalize_user_id(user or DEFAULT_USER)
+        with self.databases_lock:
+            db = self.databases.get(user_id)
+            if db is None:
+                db = DatabaseManager.from_config(self.shards.data_file(user_id), DATABASE_CONFIG)
+                self.databases[user_id] = db
+                if len(self.databases) > self.max_users:
+                    self.databases.popitem(last=False)
+            else:
+                self.databases.move_to_end(user_id)
+        db.refresh_if_changed()
+        return db
+
+    async def handle(self, method, target, body=b""):
+        """(estado, respuesta) para una petición con el cuerpo JSON sin decodificar"""
+        split = urlsplit(target)
+        params = dict(parse_qsl(split.query))
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {"error": "JSON inválido"}
+            if not isinstance(payload, dict):
+                return 400, {"error": "El cuerpo debe ser un objeto JSON"}
+            params.update(payload)
+        return await self.dispatch(method.upper(), split.path.rstrip("/") or "/", params)
+
+    async def dispatch(self, method, path, params):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {"error": f"Método {method} no admitido en {path}"}
+            return 404, {"error": f"Ruta desconocida: {path}"}
+        try:
+            result = handler(params)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return 200, result
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception:
+            logger.exception("Error atendiendo %s %s", method, path)
+            return 500, {"error": "Error interno"}
+
+    def health(self, params):
+        return {"status": "ok"}
+
+    def bmi(self, params):
+        weight = _number(params, "weight", minimum=1, maximum=500)
+        height = _number(params, "height", minimum=0.5, maximum=2.8)
+        bmi = calculate_bmi(weight, height)
+        category, _ = bmi_category(bmi)
+        return {"bmi": bmi, "category": category, "ideal_weight": round(ideal_weight(height), 1)}
+
+    def calories(self, params):
+        sessions = params.get("sessions")
+        if sessions is not None:
+            # Lote: una sola estimación vectorizada para todas las sesiones
+            if not isinstance(sessions, list) or not all(isinstance(s, dict) for s in sessions):
+                raise ApiError(400, "'sessions' debe ser una lista de objetos")
+            return {"calories": [_calories(value) for value in self.model.estimate_records(sessions).tolist()]}
+
+        activity = _choice(params, "activity", self.model.activities)
+        intensity = _choice(params, "intensity", self.model.intensities)
+        duration = _number(params, "duration", minimum=0, maximum=1440)
+        weight = _number(params, "weight", default=70, minimum=20, maximum=400)
+        sex = params.get("sex")
+        if sex not in (None, "M", "F"):
+            raise ApiError(400, "'sex' debe ser M o F")
+        calories = self.model.estimate(
+            activity, intensity, duration, weight,
+            age=_optional_number(params, "age", minimum=1, maximum=120),
+            sex=sex,
+            height=_optional_number(params, "height", minimum=50, maximum=260)
+        )
+        return {"calories": _calories(calories), "met": self.model.met(activity, intensity)}
+
+    def routine(self, params):
+        workout_type = _choice(params, "type", WORKOUT_TYPES)
+        level = _choice(params, "level", LEVELS)
+        duration = int(_number(params, "duration", minimum=5, maximum=180))
+        seed = params.get("seed")
+        if seed is not None:
+            seed = int(_number(params, "seed"))
+        exercises = self.routines.generate(workout_type, level, duration, seed=seed)
+        return {
+            "type": workout_type,
+            "level": level,
+            "duration": duration,
+            "seed": seed,
+            "minutes": round(sum(item["minutes"] for item in exercises), 1),
+            "volume": routine_volume(exercises, workout_type),
+            "exercises": exercises
+        }
+
+    def progress_page(self, params):
+        db = self.database(params.get("user"))
+        limit = int(_number(params, "limit", default=50, minimum=1, maximum=500))
+        filters = {field: params[field] for field in ("activity", "intensity") if params.get(field)}
+        items, next_cursor = db.query_page(
+            "progress", limit=limit, cursor=params.get("cursor"),
+            start=params.get("start"), end=params.get("end"),
+            descending=params.get("order", "desc") != "asc", **filters
+        )
+        return {"items": items, "next_cursor": next_cursor}
+
+    def progress_stats(self, params):
+        db = self.database(params.get("user"))
+        days = int(_number(params, "days", default=7, minimum=1, maximum=3650))
+        return {"totals": db.get_totals(), "recent": db.get_recent_totals(days), "days": days}
+
+    def add_progress(self, params):
+        sessions = params.get("sessions")
+        if not isinstance(sessions, list) or not sessions:
+            raise ApiError(400, "'sessions' debe ser una lista no vacía")
+
+        records = [self._session(session, i) for i, session in enumerate(sessions)]
+
+        # Las sesiones sin calorías se estiman en bloque con el modelo MET
+        missing = [r for r in records if r.get("calories") is None]
+        if missing:
+            for record, value in zip(missing, self.model.estimate_records(missing).tolist()):
+                record["calories"] = _calories(value)
+
+        self.database(params.get("user")).add_progress_many(records)
+        return {"added": len(records)}
+
+    def _session(self, session, position):
+        """Sesión de POST /progress validada y normalizada como las de los importadores"""
+        if not isinstance(session, dict):
+            raise ApiError(400, f"sessions[{position}]: cada sesión debe ser un objeto")
+        try:
+            activity = session.get("activity")
+            if not isinstance(activity, str) or not activity.strip():
+                raise ApiError(400, "falta 'activity'")
+            intensity = session.get("intensity") or DEFAULT_INTENSITY
+            if intensity not in self.model.intensities:
+                raise ApiError(400, f"'intensity' debe ser uno de: {', '.join(self.model.intensities)}")
+            date = datetime.now().isoformat()
+            if session.get("date") is not None:
+                date = normalize_date(session["date"])
+                if date is None:
+                    raise ApiError(400, "'date' debe ser una fecha ISO 8601")
+            record = dict(
+                session,
+                date=date,
+                activity=activity.strip(),
+                intensity=intensity,
+                duration=_number(session, "duration", minimum=0, maximum=1440),
+                calories=_optional_number(session, "calories", minimum=0)
+            )
+            for name in ("weight", "distance_km"):
+                if record.get(name) is not None:
+                    record[name] = _number(session, name, minimum=0)
+        except ApiError as e:
+            raise ApiError(400, f"sessions[{position}]: {e}")
+        return record
+
+    async def batch(self, params):
+        """Varias peticiones en una; se atienden concurrentemente y en el mismo orden"""
+        requests = params.get("requests")
+        if not isinstance(requests, list) or not requests:
+            raise ApiError(400, "'requests' debe ser una lista no vacía")
+        if len(requests) > self.max_batch:
+            raise ApiError(413, f"Máximo {self.max_batch} peticiones por lote")
+        results = await asyncio.gather(*(self._batch_item(request) for request in requests))
+        return {"responses": [{"status": status, "body": body} for status, body in results]}
+
+    async def _batch_item(self, request):
+        if not isinstance(request, dict):
+            return 400, {"error": "Cada petición debe ser un objeto"}
+        split = urlsplit(str(request.get("path", "")))
+        path = split.path.rstrip("/") or "/"
+        if path == "/batch":
+            return 400, {"error": "No se admiten lotes anidados"}
+        body = request.get("body") or {}
+        if not isinstance(body, dict):
+            return 400, {"error": "El cuerpo debe ser un objeto JSON"}
+        params = dict(parse_qsl(split.query), **body)
+        return await self.dispatch(str(request.get("method", "GET")).upper(), path, params)
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, separator, value = line.decode("latin-1").partition(":")
+        if not separator:
+            raise ValueError(f"Cabecera mal formada: {line!r}")
+        headers[name.strip().lower()] = value.strip()
+
+
+def _keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def _respond(writer, status, payload, keep_alive, keepalive_timeout):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close"
+    ]
+    if keep_alive:
+        head.append(f"Keep-Alive: timeout={keepalive_timeout}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def handle_connection(api, reader, writer, keepalive_timeout, max_body):
+    """Atiende peticiones de una conexión hasta que el cliente la cierra o expira"""
+    try:
+        while True:
+            try:
+                request_line = await asyncio.wait_for(reader.readline(), keepalive_timeout)
+            except asyncio.TimeoutError:
+                break
+            if not request_line:
+                break
+            if not request_line.strip():
+                continue
+
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+                headers = await _read_headers(reader)
+                length = int(headers.get("content-length") or 0)
+                if length < 0:
+                    raise ValueError("Content-Length negativo")
+            except ValueError:
+                await _respond(writer, 400, {"error": "Petición HTTP mal formada"}, False, keepalive_timeout)
+                break
+            if length > max_body:
+                await _respond(writer, 413, {"error": f"Cuerpo mayor de {max_body} bytes"}, False, keepalive_timeout)
+                break
+
+            body = await reader.readexactly(length) if length else b""
+            keep_alive = _keep_alive(version, headers)
+            status, payload = await api.handle(method, target, body)
+            await _respond(writer, status, payload, keep_alive, keepalive_timeout)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host, port, reuse_port=False, shards_dir=None, legacy_file=None):
+    api = FitnessApi(shards_dir=shards_dir, legacy_file=legacy_file)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(
+            api, reader, writer, API_CONFIG["keepalive_timeout"], API_CONFIG["max_body"]),
+        host, port, reuse_port=reuse_port or None, backlog=1024
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def run_worker(host, port, reuse_port, shards_dir, legacy_file):
+    try:
+        asyncio.run(serve(host, port, reuse_port, shards_dir, legacy_file))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP local de Fitness Assistant")
+    parser.add_argument("--host", default=API_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=API_CONFIG["port"])
+    parser.add_argument("--workers", type=int, default=API_CONFIG["workers"],
+                        help="procesos que atienden el mismo puerto")
+    parser.add_argument("--data-dir", help=f"directorio de shards (por defecto {DATABASE_CONFIG['shards_dir']})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format=LOGGING_CONFIG["format"])
+
+    workers = max(1, args.workers)
+    if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        print("⚠️ Esta plataforma no admite SO_REUSEPORT; se usa un único proceso")
+        workers = 1
+
+    # Los datos previos al particionado solo se migran en el directorio por defecto
+    shards_dir = args.data_dir or DATABASE_CONFIG["shards_dir"]
+    legacy_file = None if args.data_dir else DATABASE_CONFIG["legacy_file"]
+
+    print(f"🚀 API de Fitness Assistant en http://{args.host}:{args.port} ({workers} proceso(s))")
+    if workers == 1:
+        run_worker(args.host, args.port, False, shards_dir, legacy_file)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.host, args.port, True, shards_dir, legacy_file))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # SIGTERM al proceso principal también detiene a los workers (se instala
+    # tras arrancarlos para que no lo hereden)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for process in processes:
+            process.join()
+    except (KeyboardInterrupt, SystemExit):
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
+    print("\n🏁 API detenida")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peticiones/s de la API HTTP (api.py) con un proceso frente a un pool
+Ejecutar con: python benchmarks/bench_api.py [--seconds 5] [--connections 32] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Mezcla de peticiones: cálculos puros y consultas sobre el historial
+MIX = [
+    ("POST", "/bmi", {"weight": 72, "height": 1.78}),
+    ("POST", "/calories", {"activity": "Correr", "intensity": "Moderada", "duration": 30, "weight": 70}),
+    ("POST", "/routines", {"type": "fuerza", "level": "intermedio", "duration": 45}),
+    ("GET", "/progress?user=bench&limit=20", None),
+    ("GET", "/progress/stats?user=bench&days=30", None)
+]
+BATCH_SIZE = 20
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def call(port, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f"http://localhost:{port}{path}", data=data, method=method)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_server(port, workers, data_dir):
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "api.py"), "--port", str(port), "--workers", str(workers),
+         "--data-dir", data_dir],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            call(port, "GET", "/health")
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("La API no arrancó a tiempo")
+
+
+async def _request(reader, writer, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                 + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _connection(port, requests, deadline, latencies, errors):
+    """Una conexión keep-alive que repite la mezcla hasta el plazo"""
+    reader, writer = await asyncio.open_connection("localhost", port)
+    i = 0
+    while time.perf_counter() < deadline:
+        method, path, body = requests[i % len(requests)]
+        i += 1
+        start = time.perf_counter()
+        if await _request(reader, writer, method, path, body) != 200:
+            errors.append(path)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+def run_client(args):
+    """Proceso cliente: `connections` conexiones concurrentes durante `seconds`"""
+    port, connections, seconds, requests = args
+
+    async def run():
+        latencies, errors = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            _connection(port, requests[i % len(requests):] + requests[:i % len(requests)], deadline, latencies, errors)
+            for i in range(connections)
+        ))
+        return latencies, len(errors)
+
+    return asyncio.run(run())
+
+
+def load(port, connections, seconds, clients, requests):
+    per_client = max(1, connections // clients)
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(run_client, [(port, per_client, seconds, requests)] * clients)
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    errors = sum(count for _, count in results)
+    return latencies, errors
+
+
+def report(label, latencies, errors, seconds, ops_per_request=1):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<34}{len(latencies) / seconds:>10,.0f} req/s{len(latencies) * ops_per_request / seconds:>10,.0f} ops/s"
+          f"   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   errores {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--connections", type=int, default=32, help="conexiones keep-alive simultáneas")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="procesos que generan carga")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 2), help="procesos del pool de la API")
+    parser.add_argument("--sessions", type=int, default=5000, help="sesiones de historial precargadas")
+    args = parser.parse_args()
+
+    print(f"🖥️ {os.cpu_count()} CPU · {args.connections} conexiones · {args.clients} proceso(s) cliente · "
+          f"{args.seconds:.0f}s por escenario")
+
+    batched = [("POST", "/batch", {"requests": [
+        {"method": method, "path": path, "body": body}
+        for method, path, body in (MIX * BATCH_SIZE)[i:i + BATCH_SIZE]
+    ]}) for i in range(len(MIX))]
+
+    scenarios = [
+        ("1 proceso", 1, MIX, 1),
+        (f"pool de {args.workers} procesos", args.workers, MIX, 1),
+        (f"1 proceso, /batch de {BATCH_SIZE}", 1, batched, BATCH_SIZE)
+    ]
+
+    sessions = [{"activity": "Correr", "intensity": "Moderada", "duration": 30 + i % 60,
+                 "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T07:00:00"}
+                for i in range(args.sessions)]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for n, (label, workers, requests, ops) in enumerate(scenarios):
+            port = free_port()
+            server = start_server(port, workers, data_dir)
+            try:
+                # El historial se carga una vez; los demás escenarios lo leen del mismo directorio
+                if n == 0:
+                    call(port, "POST", "/progress", {"user": "bench", "sessions": sessions})
+                latencies, errors = load(port, args.connections, args.seconds, args.clients, requests)
+                report(label, latencies, errors, args.seconds, ops)
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
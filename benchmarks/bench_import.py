@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importación de sesiones desde ficheros exportados (CSV, GPX, TCX)
+Ejecutar con: python benchmarks/bench_import.py [--sessions 100000] [--engine journal]
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from config.settings import DATABASE_CONFIG, MET_VALUES
+from core.calories import MetModel
+from core.database import DatabaseManager
+from core.importers import import_sessions
+
+SPORTS = ["running", "cycling", "walking", "swimming", "rowing", "hiking"]
+
+
+def write_csv(path, sessions, rng):
+    start = datetime(2020, 1, 1, 7, 0)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["start_time", "sport", "duration_s", "distance_km"])
+        for i in range(sessions):
+            writer.writerow([
+                (start + timedelta(hours=6 * i)).isoformat(),
+                rng.choice(SPORTS),
+                rng.randint(900, 5400),
+                round(rng.uniform(2, 25), 2)
+            ])
+
+
+def write_gpx(path, points, rng):
+    start = datetime(2024, 5, 1, 8, 0)
+    lat, lon = 40.4168, -3.7038
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0"?>\n<gpx xmlns="http://www.topografix.com/GPX/1/1">\n')
+        f.write('<trk><type>running</type><trkseg>\n')
+        for i in range(points):
+            lat += rng.uniform(-1e-4, 1e-4)
+            lon += rng.uniform(-1e-4, 1e-4)
+            when = (start + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            f.write(f'<trkpt lat="{lat:.6f}" lon="{lon:.6f}"><time>{when}</time></trkpt>\n')
+        f.write('</trkseg></trk>\n</gpx>\n')
+
+
+def write_tcx(path, activities, rng):
+    start = datetime(2023, 1, 1, 18, 0)
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0"?>\n<TrainingCenterDatabase '
+                'xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2"><Activities>\n')
+        for i in range(activities):
+            when = (start + timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            f.write(f'<Activity Sport="Biking"><Id>{when}</Id><Lap StartTime="{when}">'
+                    f'<TotalTimeSeconds>{rng.randint(1200, 4800)}</TotalTimeSeconds>'
+                    f'<DistanceMeters>{rng.randint(5000, 40000)}</DistanceMeters>'
+                    f'<Calories>{rng.randint(150, 900)}</Calories></Lap></Activity>\n')
+        f.write('</Activities></TrainingCenterDatabase>\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=100_000, help="filas del CSV sintético")
+    parser.add_argument("--engine", default="journal", choices=["json", "journal", "sqlite"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    model = MetModel(MET_VALUES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exports = Path(tmp) / "exports"
+        exports.mkdir()
+        write_csv(exports / "sessions.csv", args.sessions, rng)
+        write_gpx(exports / "long_run.gpx", 20_000, rng)
+        write_tcx(exports / "rides.tcx", 1_000, rng)
+
+        # El mismo camino que run.py import y la app: DatabaseManager con DATABASE_CONFIG
+        data_file = str(Path(tmp) / "fitness_data.json")
+        config = dict(DATABASE_CONFIG, engine=args.engine, backup_enabled=False)
+        db = DatabaseManager.from_config(data_file, config)
+
+        start = time.perf_counter()
+        stats = import_sessions(exports, db.add_progress_many, model=model, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        reloaded = len(DatabaseManager.from_config(data_file, config).get_progress())
+
+    print(f"📥 {stats['sessions']:,} sesiones de {stats['files']} ficheros en {elapsed:.2f}s "
+          f"→ {stats['sessions'] / elapsed:,.0f} sesiones/s ({args.engine}, lotes de {args.batch_size})")
+    print(f"💾 {reloaded:,} sesiones al recargar; errores: {stats['errors'] or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
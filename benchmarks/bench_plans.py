@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: planes semanales por segundo para una cohorte de usuarios
+Ejecutar con: python benchmarks/bench_plans.py [--users 1000] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from core.catalog import LEVELS
+from core.plans import TRAINING_DAYS, generate_plans
+
+
+def cohort(users):
+    """Peticiones sintéticas y reproducibles: nivel, días y duración variados"""
+    days = sorted(TRAINING_DAYS)
+    return [
+        {
+            "user_id": f"user-{i:05d}",
+            "level": LEVELS[i % len(LEVELS)],
+            "days_per_week": days[i % len(days)],
+            "weeks": 4,
+            "duration": 30 + 15 * (i % 3),
+            "seed": i
+        }
+        for i in range(users)
+    ]
+
+
+def run(requests, workers):
+    start = time.perf_counter()
+    plans = generate_plans(requests, workers=workers)
+    elapsed = time.perf_counter() - start
+    return plans, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    requests = cohort(args.users)
+    sessions = None
+
+    for label, workers in (("secuencial", 1), (f"pool x{args.workers}", args.workers)):
+        plans, elapsed = run(requests, workers)
+        sessions = sum(len(plan["sessions"]) for plan in plans)
+        print(f"📅 {label:>12}: {len(plans)} planes en {elapsed:.2f}s "
+              f"→ {len(plans) / elapsed:,.0f} planes/s")
+
+    print(f"🏋️  {sessions} sesiones generadas por pasada")
+
+
+if __name__ == "__main__":
+    main()
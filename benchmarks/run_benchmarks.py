@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks: almacenamiento, rutinas, filtrado de ejercicios y agregados
+Ejecutar con: python benchmarks/run_benchmarks.py [--sizes 1k,100k] [--save-baseline | --compare]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import synthetic  # añade la raíz y src/ al sys.path
+
+from config.settings import DATABASE_CONFIG
+from core import LEVELS, WORKOUT_TYPES, AggregateCache, DatabaseManager, RoutineEngine, load_catalog
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def measure(fn, repeat, warmup=1):
+    """Latencias en segundos de `repeat` llamadas a `fn` tras `warmup` en vacío"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def result(case, size, latencies, items_per_call=1):
+    total = sum(latencies)
+    return {
+        "case": case,
+        "size": size,
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": items_per_call * len(latencies) / total if total else float("inf")
+    }
+
+
+def storage_cases(size_label, records, engine, tmp):
+    """load/save/add_progress/consultas de DatabaseManager sobre un documento sintético"""
+    data_file = Path(tmp) / f"bench-{engine}-{size_label}.json"
+    # Una mitad de sesiones de cardio y otra de rutinas
+    synthetic.write_dataset(data_file, records // 2, records - records // 2, engine=engine)
+
+    config = dict(DATABASE_CONFIG, engine=engine, backup_enabled=False)
+    db = DatabaseManager.from_config(str(data_file), config)
+    repeat = max(3, min(30, 200_000 // records))
+    total = len(db.get_progress()) + len(db.get_workouts())
+
+    yield result("db.load_data", size_label, measure(db.load_data, repeat), total)
+    yield result("db.save_data", size_label, measure(db.save_data, repeat), total)
+
+    # Al menos compact_every altas seguidas, como las recibe la aplicación
+    rng = random.Random(7)
+    fresh = synthetic.progress_records(200, seed=99)
+    yield result("db.add_progress", size_label,
+                 measure(lambda: db.add_progress(dict(rng.choice(fresh))), config["compact_every"]))
+
+    if engine == "journal":
+        # Con historiales grandes la compactación llega tras miles de altas y
+        # no cae en la muestra anterior: aquí cada alta paga una
+        compacting = DatabaseManager.from_config(str(data_file), dict(config, compact_every=1, compact_ratio=0))
+        yield result("db.add_progress.compact", size_label,
+                     measure(lambda: compacting.add_progress(dict(rng.choice(fresh))), repeat))
+
+    start, end = "2019-01-01", "2019-12-31"
+    db.query_page("progress", limit=50, start=start, end=end)
+    yield result("db.query_page", size_label,
+                 measure(lambda: db.query_page("progress", limit=50, start=start, end=end), 200))
+
+
+def dashboard_cases(size_label, records):
+    """Reconstrucción completa de los agregados y lectura de totales del Dashboard"""
+    data = synthetic.document(records // 2, records - records // 2)
+    repeat = max(3, min(30, 200_000 // records))
+
+    def rebuild():
+        data.pop("aggregates", None)
+        return AggregateCache.for_document(data)
+
+    cache = rebuild()
+    yield result("dashboard.rebuild", size_label, measure(rebuild, repeat), records)
+    yield result("dashboard.totals", size_label,
+                 measure(lambda: (cache.totals(), cache.window(7)), 1000))
+
+
+def catalog_cases():
+    """Casos que dependen del catálogo, no del tamaño del historial"""
+    catalog = load_catalog()
+    routine_engine = RoutineEngine(catalog)
+    combos = [(t, l, d) for t in WORKOUT_TYPES for l in LEVELS for d in (15, 30, 45, 60, 90)]
+    rng = random.Random(3)
+    yield result("routine.generate", "-",
+                 measure(lambda: routine_engine.generate(*rng.choice(combos)), 1000))
+    yield result("routine.generate_seeded", "-",
+                 measure(lambda: routine_engine.generate(*rng.choice(combos), seed=rng.randint(1, 20)), 1000))
+
+    # Mismo trabajo que show_muscle_exercises: filtro combinado + recuentos por faceta
+    facets = catalog.facets
+    selections = []
+    for muscle in catalog.muscle_groups:
+        for difficulty in ([], ["Principiante"], ["Intermedio", "Avanzado"]):
+            selections.append({"muscle_group": [muscle], "difficulty": difficulty,
+                               "equipment": rng.sample(facets.options("equipment"), 1)})
+
+    def filter_muscle():
+        chosen = rng.choice(selections)
+        facets.counts("difficulty", chosen)
+        facets.counts("equipment", chosen)
+        facets.counts("equipment", {"muscle_group": chosen["muscle_group"]})
+        facets.filter(chosen)
+
+    yield result("anatomy.filter", "-", measure(filter_muscle, 5000))
+    yield result("anatomy.search", "-",
+                 measure(lambda: catalog.search(rng.choice(["biceps", "sentadilla", "press banca", "core"])), 2000))
+
+
+def run(sizes, engine):
+    results = list(catalog_cases())
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in sizes:
+            records = SIZES[label]
+            print(f"⏳ {label}: {records:,} registros ({engine})", file=sys.stderr)
+            results.extend(storage_cases(label, records, engine, tmp))
+            results.extend(dashboard_cases(label, records))
+    return results
+
+
+def key(row, engine):
+    return f"{row['case']}@{row['size']}" if row["size"] == "-" else f"{row['case']}@{row['size']}/{engine}"
+
+
+def print_table(results, baseline=None, engine=None):
+    print(f"{'caso':<26}{'tamaño':>7}{'p50 ms':>11}{'p99 ms':>11}{'ops/s':>14}{'vs base':>10}")
+    for row in results:
+        ratio = ""
+        if baseline:
+            base = baseline.get(key(row, engine))
+            if base:
+                ratio = f"{row['p50_ms'] / base['p50_ms']:.2f}x"
+        print(f"{row['case']:<26}{row['size']:>7}{row['p50_ms']:>11.3f}{row['p99_ms']:>11.3f}"
+              f"{row['throughput']:>14,.0f}{ratio:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1k,100k", help="lista de 1k, 100k y 1m")
+    parser.add_argument("--engine", default="journal", choices=["json", "journal", "sqlite"])
+    parser.add_argument("--save-baseline", action="store_true", help=f"guarda los resultados en {BASELINE_FILE.name}")
+    parser.add_argument("--compare", action="store_true", help="falla si algún p50 empeora más de --tolerance")
+    # Las baselines dependen de la máquina: compara siempre contra una generada en el mismo equipo
+    parser.add_argument("--tolerance", type=float, default=2.0, help="factor de p50 admitido (2.0 = el doble)")
+    args = parser.parse_args()
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"tamaños desconocidos: {', '.join(unknown)}")
+
+    results = run(sizes, args.engine)
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    print_table(results, baseline, args.engine)
+
+    if args.save_baseline:
+        baseline.update({
+            key(row, args.engine): {k: round(row[k], 4) for k in ("p50_ms", "p99_ms", "throughput")}
+            for row in results
+        })
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"💾 Baseline guardada en {BASELINE_FILE}")
+
+    if args.compare:
+        regressions = [
+            row for row in results
+            if key(row, args.engine) in baseline
+            and row["p50_ms"] > baseline[key(row, args.engine)]["p50_ms"] * args.tolerance
+        ]
+        for row in regressions:
+            print(f"❌ Regresión en {key(row, args.engine)}: p50 {row['p50_ms']:.3f} ms "
+                  f"(base {baseline[key(row, args.engine)]['p50_ms']:.3f} ms)")
+        if regressions:
+            sys.exit(1)
+        print("✅ Sin regresiones frente a la baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Generador de datos sintéticos y reproducibles para los benchmarks
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from config.settings import MET_VALUES
+from core.catalog import LEVELS, WORKOUT_TYPES, load_catalog
+from core.storage import create_storage, empty_document
+
+START = datetime(2015, 1, 1, 6, 0)
+INTENSITIES = ["Baja", "Moderada", "Alta"]
+
+
+def progress_records(count, seed=0):
+    """Sesiones de cardio con el esquema de CardioPlanner, en orden de fecha"""
+    rng = random.Random(seed)
+    activities = list(MET_VALUES)
+    step = timedelta(days=3650) / max(count, 1)
+    records = []
+    for i in range(count):
+        activity = rng.choice(activities)
+        intensity = rng.choice(INTENSITIES)
+        duration = rng.randint(10, 120)
+        weight = rng.randint(50, 110)
+        records.append({
+            "date": (START + step * i).isoformat(),
+            "activity": activity,
+            "duration": duration,
+            "intensity": intensity,
+            "weight": weight,
+            "calories": MET_VALUES[activity][intensity] * 3.5 * weight / 200 * duration
+        })
+    return records
+
+
+def workout_records(count, seed=0):
+    """Rutinas guardadas con ejercicios reales del catálogo"""
+    rng = random.Random(seed + 1)
+    catalog = load_catalog()
+    step = timedelta(days=3650) / max(count, 1)
+    records = []
+    for i in range(count):
+        workout_type = rng.choice(WORKOUT_TYPES)
+        level = rng.choice(LEVELS)
+        pool = catalog.routine_exercises(workout_type, level)
+        exercises = rng.sample(pool, min(len(pool), rng.randint(3, 6)))
+        records.append({
+            "date": (START + step * i).isoformat(),
+            "type": workout_type,
+            "level": level,
+            "duration": rng.choice([15, 30, 45, 60]),
+            "exercises": [
+                {"exercise": e["name"], "sets": e["prescription"], "description": e["description"]}
+                for e in exercises
+            ],
+            "scientific_basis": True
+        })
+    return records
+
+
+def document(progress, workouts, seed=0):
+    data = empty_document()
+    data["progress"] = progress_records(progress, seed)
+    data["workouts"] = workout_records(workouts, seed)
+    return data
+
+
+def write_dataset(data_file, progress, workouts, engine="journal", seed=0):
+    """Escribe un documento sintético con el motor indicado y devuelve el documento"""
+    data = document(progress, workouts, seed)
+    storage = create_storage(str(data_file), engine=engine)
+    with storage.locked():
+        storage.save(data)
+    return data
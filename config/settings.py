@@ -24,76 +24,27 @@ APP_CONFIG = {
 # Configuración de base de datos
 DATABASE_CONFIG = {
     "file_path": DATA_DIR / "fitness_data.json",
-    "backup_enabled": True,
-    "backup_interval": 24  # horas
+    "backup_enabled": True,  # copias del último snapshot válido en <shard>/backups
+    "backup_interval": 24,  # horas
+    "engine": "journal",  # "journal" (solo-anexado), "json" (documento completo) o "sqlite"
+    "compact_every": 500,  # registros mínimos en el journal antes de compactar
+    "compact_ratio": 0.5,  # ... y tamaño del journal respecto al snapshot
+    "shards_dir": DATA_DIR / "users",  # un shard por usuario
+    "legacy_file": BASE_DIR / "fitness_data.json",  # datos previos al particionado
+    "max_cached_users": 128  # DatabaseManager en memoria por proceso
 }
 
 # Configuración de visualizaciones
 CHART_CONFIG = {
     "theme": "streamlit",
     "color_palette": ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7"],
-    "default_height": 400
+    "default_height": 400,
+    "max_points": 500  # puntos máximos enviados al navegador por serie
 }
 
-# Ejercicios predefinidos por categoría y nivel
-EXERCISE_DATABASE = {
-    "fuerza": {
-        "principiante": [
-            {"name": "Flexiones", "sets": "3 x 8-12", "description": "Ejercicio básico de empuje"},
-            {"name": "Sentadillas", "sets": "3 x 10-15", "description": "Fortalece piernas y glúteos"},
-            {"name": "Plancha", "sets": "3 x 30s", "description": "Core y estabilidad"},
-            {"name": "Burpees", "sets": "3 x 5-8", "description": "Ejercicio completo"},
-        ],
-        "intermedio": [
-            {"name": "Flexiones diamante", "sets": "3 x 8-12", "description": "Mayor dificultad en tríceps"},
-            {"name": "Sentadillas con salto", "sets": "3 x 10-12", "description": "Añade componente pliométrico"},
-            {"name": "Mountain climbers", "sets": "3 x 20", "description": "Cardio y core"},
-            {"name": "Lunges", "sets": "3 x 12 c/u", "description": "Trabajo unilateral de piernas"},
-        ],
-        "avanzado": [
-            {"name": "Flexiones con palmada", "sets": "3 x 6-10", "description": "Potencia explosiva"},
-            {"name": "Pistol squats", "sets": "3 x 5 c/u", "description": "Fuerza unilateral avanzada"},
-            {"name": "Handstand push-ups", "sets": "3 x 3-8", "description": "Fuerza vertical avanzada"},
-            {"name": "Single leg burpees", "sets": "3 x 6 c/u", "description": "Coordinación y fuerza"},
-        ]
-    },
-    "cardio": {
-        "principiante": [
-            {"name": "Caminata rápida", "duration": "15-20 min", "intensity": "Moderada"},
-            {"name": "Trote ligero", "duration": "10-15 min", "intensity": "Moderada"},
-            {"name": "Jumping jacks", "duration": "3 x 30s", "intensity": "Moderada"},
-            {"name": "Step ups", "duration": "3 x 45s", "intensity": "Baja-Moderada"},
-        ],
-        "intermedio": [
-            {"name": "Correr", "duration": "20-30 min", "intensity": "Moderada-Alta"},
-            {"name": "HIIT básico", "duration": "15-20 min", "intensity": "Alta"},
-            {"name": "Saltar cuerda", "duration": "10-15 min", "intensity": "Alta"},
-            {"name": "Sprint intervals", "duration": "15-20 min", "intensity": "Muy Alta"},
-        ],
-        "avanzado": [
-            {"name": "HIIT avanzado", "duration": "20-30 min", "intensity": "Muy Alta"},
-            {"name": "Tabata", "duration": "16-20 min", "intensity": "Máxima"},
-            {"name": "Sprint hills", "duration": "20-25 min", "intensity": "Muy Alta"},
-            {"name": "Plyometrics", "duration": "15-20 min", "intensity": "Alta"},
-        ]
-    },
-    "flexibilidad": {
-        "principiante": [
-            {"name": "Estiramiento de cuello", "duration": "30s x 3", "type": "Estático"},
-            {"name": "Estiramiento de brazos", "duration": "30s x 3", "type": "Estático"},
-            {"name": "Torsiones suaves", "duration": "30s x 3", "type": "Dinámico"},
-        ],
-        "intermedio": [
-            {"name": "Yoga básico", "duration": "20-30 min", "type": "Flujo"},
-            {"name": "Estiramiento dinámico", "duration": "15-20 min", "type": "Dinámico"},
-            {"name": "Pilates", "duration": "30-45 min", "type": "Control"},
-        ],
-        "avanzado": [
-            {"name": "Yoga avanzado", "duration": "45-60 min", "type": "Flujo avanzado"},
-            {"name": "Contorsiones", "duration": "30-45 min", "type": "Extremo"},
-            {"name": "Flexibilidad extrema", "duration": "45-60 min", "type": "Especializado"},
-        ]
-    }
+# Catálogo de ejercicios (RoutineGenerator y MuscleAnatomy)
+CATALOG_CONFIG = {
+    "file_path": SRC_DIR / "core" / "data" / "exercises.json"
 }
 
 # Cálculos de calorías por actividad (calorías por minuto por 70kg)
@@ -107,12 +58,31 @@ CALORIES_PER_MINUTE = {
     "Pesas": {"Baja": 3, "Moderada": 5, "Alta": 7}
 }
 
-# Categorías de IMC
-BMI_CATEGORIES = {
-    (0, 18.5): {"category": "Bajo peso", "color": "#3498db", "emoji": "🔵"},
-    (18.5, 25): {"category": "Peso normal", "color": "#2ecc71", "emoji": "🟢"},
-    (25, 30): {"category": "Sobrepeso", "color": "#f39c12", "emoji": "🟡"},
-    (30, float('inf')): {"category": "Obesidad", "color": "#e74c3c", "emoji": "🔴"}
+# Equivalentes metabólicos (MET) por actividad e intensidad
+# Valores del Compendium of Physical Activities (Ainsworth et al.)
+MET_VALUES = {
+    "Caminar": {"Baja": 2.8, "Moderada": 3.5, "Alta": 5.0},
+    "Trotar": {"Baja": 6.0, "Moderada": 7.0, "Alta": 8.0},
+    "Correr": {"Baja": 8.3, "Moderada": 9.8, "Alta": 11.5},
+    "Ciclismo": {"Baja": 4.0, "Moderada": 6.8, "Alta": 10.0},
+    "Natación": {"Baja": 5.8, "Moderada": 8.3, "Alta": 9.8},
+    "Yoga": {"Baja": 2.5, "Moderada": 3.0, "Alta": 4.0},
+    "Pesas": {"Baja": 3.5, "Moderada": 5.0, "Alta": 6.0},
+    "Pilates": {"Baja": 2.8, "Moderada": 3.0, "Alta": 3.8},
+    "Senderismo": {"Baja": 5.3, "Moderada": 6.0, "Alta": 7.8},
+    "Elíptica": {"Baja": 4.6, "Moderada": 5.0, "Alta": 5.7},
+    "Remo": {"Baja": 4.8, "Moderada": 7.0, "Alta": 8.5},
+    "Saltar la cuerda": {"Baja": 8.8, "Moderada": 11.8, "Alta": 12.3},
+    "HIIT": {"Baja": 6.0, "Moderada": 8.0, "Alta": 10.0},
+    "Baile": {"Baja": 3.0, "Moderada": 5.0, "Alta": 7.3},
+    "Subir escaleras": {"Baja": 4.0, "Moderada": 6.0, "Alta": 8.8},
+    "Boxeo": {"Baja": 5.5, "Moderada": 7.8, "Alta": 12.8},
+    "Escalada": {"Baja": 5.8, "Moderada": 7.3, "Alta": 8.0},
+    "Fútbol": {"Baja": 7.0, "Moderada": 8.0, "Alta": 10.0},
+    "Baloncesto": {"Baja": 4.5, "Moderada": 6.5, "Alta": 8.0},
+    "Tenis": {"Baja": 5.0, "Moderada": 7.3, "Alta": 8.0},
+    "Patinaje": {"Baja": 5.0, "Moderada": 7.0, "Alta": 9.8},
+    "Esquí de fondo": {"Baja": 6.8, "Moderada": 9.0, "Alta": 12.5}
 }
 
 # Recursos científicos
@@ -170,6 +140,23 @@ SCIENTIFIC_RESOURCES = {
     ]
 }
 
+# Instrumentación de rendimiento (opcional): tiempos por página, E/S y gráficos.
+# También se activa abriendo la aplicación con ?debug=1
+INSTRUMENTATION_CONFIG = {
+    "enabled": os.environ.get("FITNESS_METRICS") == "1",
+    "samples": 200  # muestras recientes por métrica en el panel de depuración
+}
+
+# API HTTP local (python api.py)
+API_CONFIG = {
+    "host": "localhost",
+    "port": 8502,
+    "workers": 1,  # procesos que comparten el puerto (SO_REUSEPORT)
+    "keepalive_timeout": 15,  # segundos de inactividad antes de cerrar la conexión
+    "max_body": 1024 * 1024,  # bytes por petición
+    "max_batch": 100  # peticiones por llamada a /batch
+}
+
 # Configuración de logging
 LOGGING_CONFIG = {
     "level": "INFO",
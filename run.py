@@ -2,23 +2,47 @@
 """
 Fitness Assistant - Punto de entrada principal
 Ejecutar con: python run.py
+
+Sin interfaz (los resultados salen por stdout, uno por línea, para encadenar con pipes):
+  python run.py routines -n 100000 > rutinas.jsonl
+  python run.py recalc data/users/ab/ana/fitness_data.json --only-missing > progreso.jsonl
+  python run.py aggregates progreso.jsonl --by week
+  python run.py import exportaciones/ --user ana
+  python run.py export --user ana --format csv > ana.csv
 """
 
+import argparse
+import csv
+import json
+import os
 import subprocess
 import sys
-import os
+from contextlib import nullcontext
+from itertools import chain
+from pathlib import Path
 
-def main():
+ROOT = Path(__file__).resolve().parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "src"))
+
+# Columnas del CSV exportado (el de progreso se puede volver a importar)
+EXPORT_COLUMNS = {
+    "progress": ["date", "activity", "duration", "intensity", "calories", "weight", "distance_km"],
+    "workouts": ["date", "type", "level", "duration", "exercises"]
+}
+
+def run_app(args=None):
     """Ejecuta la aplicación Streamlit"""
+    print("🚀 Iniciando Fitness Assistant...")
     try:
         # Cambiar al directorio del script
         os.chdir(os.path.dirname(os.path.abspath(__file__)))
         
         # Ejecutar streamlit
         subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            "src/main.py", 
-            "--server.port=8501", 
+            sys.executable, "-m", "streamlit", "run",
+            "src/main.py",
+            "--server.port=8501",
             "--server.address=localhost"
         ])
     except KeyboardInterrupt:
@@ -26,6 +50,222 @@ def main():
     except Exception as e:
         print(f"❌ Error ejecutando la aplicación: {e}")
 
+def is_jsonl(path):
+    return path == "-" or str(path).endswith((".jsonl", ".ndjson"))
+
+def read_jsonl(path):
+    """Registros de un fichero JSON Lines (o de stdin con "-"), de uno en uno"""
+    with (nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8")) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: JSON inválido ({e})")
+
+def jsonl_collection(record):
+    """Colección de una línea JSONL: su campo "collection" o, si no lo trae, la forma del registro"""
+    if record.get("collection") in EXPORT_COLUMNS:
+        return record["collection"]
+    # Las sesiones tienen actividad; las rutinas, tipo y ejercicio(s) (las personalizadas, "exercise")
+    if "activity" not in record and any(key in record for key in ("exercises", "exercise", "type")):
+        return "workouts"
+    return "progress"
+
+def load_document(path, engine):
+    """Documento completo de un fichero de datos de la aplicación"""
+    from core import create_storage
+    
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No existe {path}")
+    storage = create_storage(str(path), engine=engine)
+    with storage.locked():
+        return storage.load()
+
+def write_lines(lines):
+    out = sys.stdout
+    for line in lines:
+        out.write(line)
+        out.write("\n")
+    out.flush()
+
+def open_database(args):
+    """DatabaseManager de --data-file o del shard de --user"""
+    from config.settings import DATABASE_CONFIG
+    from core import DatabaseManager, ShardIndex
+    
+    config = dict(DATABASE_CONFIG, engine=args.engine or DATABASE_CONFIG["engine"])
+    data_file = args.data_file
+    if data_file is None:
+        shards = ShardIndex(DATABASE_CONFIG["shards_dir"], legacy_file=DATABASE_CONFIG["legacy_file"])
+        data_file = shards.data_file(args.user)
+    return DatabaseManager.from_config(str(data_file), config)
+
+def cmd_routines(args):
+    from config.settings import CATALOG_CONFIG
+    from core.batch import generate_routines
+    
+    write_lines(generate_routines(
+        args.count, seed=args.seed, workout_type=args.type, level=args.level, duration=args.duration,
+        catalog_file=CATALOG_CONFIG["file_path"], workers=args.workers, chunk_size=args.chunk_size
+    ))
+
+def cmd_recalc(args):
+    from config.settings import DATABASE_CONFIG, MET_VALUES
+    from core import MetModel
+    from core.batch import recompute_calories
+    
+    if args.in_place:
+        if is_jsonl(args.input):
+            raise ValueError("--in-place solo admite ficheros de datos de la aplicación")
+        args.data_file = args.input
+        db = open_database(args)
+        if db.last_error:
+            # Sin los datos originales no se sobrescribe nada
+            raise OSError(db.last_error)
+        updated = db.recompute_calories(MetModel(MET_VALUES), only_missing=args.only_missing)
+        print(json.dumps({"updated": updated}))
+        return
+    
+    if is_jsonl(args.input):
+        records = read_jsonl(args.input)
+    else:
+        records = load_document(args.input, args.engine or DATABASE_CONFIG["engine"])["progress"]
+    results = recompute_calories(records, MET_VALUES, only_missing=args.only_missing,
+                                 workers=args.workers, chunk_size=args.chunk_size)
+    write_lines(json.dumps(record, ensure_ascii=False) for record in results)
+
+def cmd_aggregates(args):
+    from config.settings import DATABASE_CONFIG
+    from core.batch import aggregate
+    
+    if is_jsonl(args.input):
+        entries = ((jsonl_collection(r), r) for r in read_jsonl(args.input))
+    else:
+        data = load_document(args.input, args.engine or DATABASE_CONFIG["engine"])
+        entries = chain((("workouts", r) for r in data["workouts"]), (("progress", r) for r in data["progress"]))
+    
+    cache = aggregate(entries, workers=args.workers, chunk_size=args.chunk_size)
+    if args.by:
+        buckets = cache.state["days" if args.by == "day" else "weeks"]
+        write_lines(json.dumps(dict(period=period, **buckets[period])) for period in sorted(buckets))
+    else:
+        print(json.dumps({"totals": cache.totals(), "recent": cache.window(args.days), "days": args.days}))
+
+def cmd_import(args):
+    from config.settings import MET_VALUES
+    from core import MetModel, import_sessions
+    
+    db = open_database(args)
+    stats = import_sessions(args.paths, db.add_progress_many, model=MetModel(MET_VALUES), batch_size=args.batch_size)
+    if db.last_error:
+        stats["errors"].append(db.last_error)
+    print(json.dumps(stats, ensure_ascii=False))
+    if stats["errors"]:
+        print(f"⚠️ {len(stats['errors'])} errores durante la importación", file=sys.stderr)
+
+def cmd_export(args):
+    db = open_database(args)
+    records = db.query(args.collection, start=args.start, end=args.end)
+    
+    if args.format == "jsonl":
+        write_lines(json.dumps(record, ensure_ascii=False) for record in records)
+        return
+    
+    writer = csv.DictWriter(sys.stdout, EXPORT_COLUMNS[args.collection], extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        if args.collection == "workouts":
+            record = dict(record, exercises="; ".join(e.get("exercise", "") for e in record.get("exercises") or []))
+        writer.writerow(record)
+    sys.stdout.flush()
+
+def build_parser():
+    from core import LEVELS, WORKOUT_TYPES
+    
+    parser = argparse.ArgumentParser(description="Fitness Assistant: aplicación y trabajos por lotes")
+    commands = parser.add_subparsers(dest="command", metavar="comando")
+    
+    app = commands.add_parser("app", help="abre la aplicación Streamlit (por defecto)")
+    app.set_defaults(func=run_app)
+    
+    def parallel(command, chunk_size):
+        command.add_argument("--workers", type=int, default=None,
+                             help="procesos para entradas grandes (por defecto, uno por CPU)")
+        command.add_argument("--chunk-size", type=int, default=chunk_size, help="registros por trozo de trabajo")
+    
+    def storage(command):
+        command.add_argument("--engine", choices=["json", "journal", "sqlite"],
+                             help="motor del fichero de datos (por defecto el de DATABASE_CONFIG)")
+    
+    def target(command):
+        group = command.add_mutually_exclusive_group()
+        group.add_argument("--user", default="default", help="usuario cuyo shard se usa")
+        group.add_argument("--data-file", help="fichero de datos concreto en lugar del shard del usuario")
+        storage(command)
+    
+    routines = commands.add_parser("routines", help="genera N rutinas en JSON Lines")
+    routines.add_argument("-n", "--count", type=int, required=True)
+    routines.add_argument("--type", choices=WORKOUT_TYPES, help="fijo para todas (si no, se sortea)")
+    routines.add_argument("--level", choices=LEVELS)
+    routines.add_argument("--duration", type=int, help="minutos (si no, entre 10 y 90)")
+    routines.add_argument("--seed", type=int, default=0, help="la rutina i usa la semilla seed + i")
+    parallel(routines, 1000)
+    routines.set_defaults(func=cmd_routines)
+    
+    recalc = commands.add_parser("recalc", help="recalcula las calorías de un historial")
+    recalc.add_argument("input", help="fichero de datos, .jsonl o - (stdin)")
+    recalc.add_argument("--only-missing", action="store_true", help="solo sesiones sin calorías")
+    recalc.add_argument("--in-place", action="store_true", help="guarda en el fichero de datos en lugar de stdout")
+    storage(recalc)
+    parallel(recalc, 20000)
+    recalc.set_defaults(func=cmd_recalc)
+    
+    aggregates = commands.add_parser("aggregates", help="totales y buckets de un historial")
+    aggregates.add_argument("input", help="fichero de datos, .jsonl o - (stdin)")
+    aggregates.add_argument("--by", choices=["day", "week"], help="una línea por día o semana ISO")
+    aggregates.add_argument("--days", type=int, default=7, help="ventana de los totales recientes")
+    storage(aggregates)
+    parallel(aggregates, 50000)
+    aggregates.set_defaults(func=cmd_aggregates)
+    
+    importer = commands.add_parser("import", help="importa exportaciones CSV/GPX/TCX")
+    importer.add_argument("paths", nargs="+", help="ficheros o directorios")
+    importer.add_argument("--batch-size", type=int, default=1000)
+    target(importer)
+    importer.set_defaults(func=cmd_import)
+    
+    export = commands.add_parser("export", help="exporta el historial a JSON Lines o CSV")
+    export.add_argument("--collection", choices=["progress", "workouts"], default="progress")
+    export.add_argument("--start", help="fecha ISO inicial (incluida)")
+    export.add_argument("--end", help="fecha ISO final (incluida)")
+    export.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    target(export)
+    export.set_defaults(func=cmd_export)
+    
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return run_app()
+    
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        return run_app()
+    
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # El consumidor del pipe (p. ej. head) cerró antes de terminar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
 if __name__ == "__main__":
-    print("🚀 Iniciando Fitness Assistant...")
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,49 @@
+"""
+Núcleo de Fitness Assistant (lógica sin interfaz de usuario)
+
+Todo lo que hay aquí funciona sin Streamlit: la app, los benchmarks y los
+procesos por lotes importan las mismas piezas, p. ej.
+
+    from core import DatabaseManager, RoutineEngine, load_catalog
+"""
+
+from .aggregates import AggregateCache
+from .bmi import bmi_category, calculate_bmi, ideal_weight
+from .calories import CalorieTable, MetModel
+from .catalog import LEVELS, WORKOUT_TYPES, ExerciseCatalog, load_catalog
+from .database import DatabaseManager
+from .importers import DEFAULT_INTENSITY, ImportFormatError, import_sessions, iter_sessions, normalize_date
+from .plans import PlanGenerator, generate_plans
+from .prescriptions import parse_prescription, routine_volume
+from .routines import RoutineEngine
+from .shards import DEFAULT_USER, ShardIndex, normalize_user_id
+from .storage import create_storage, empty_document
+
+__all__ = [
+    "AggregateCache",
+    "CalorieTable",
+    "DEFAULT_INTENSITY",
+    "DEFAULT_USER",
+    "DatabaseManager",
+    "ExerciseCatalog",
+    "ImportFormatError",
+    "LEVELS",
+    "MetModel",
+    "PlanGenerator",
+    "RoutineEngine",
+    "ShardIndex",
+    "WORKOUT_TYPES",
+    "bmi_category",
+    "calculate_bmi",
+    "create_storage",
+    "empty_document",
+    "generate_plans",
+    "ideal_weight",
+    "import_sessions",
+    "iter_sessions",
+    "load_catalog",
+    "normalize_date",
+    "normalize_user_id",
+    "parse_prescription",
+    "routine_volume",
+]
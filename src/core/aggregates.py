@@ -0,0 +1,119 @@
+"""
+Métricas agregadas mantenidas de forma incremental (totales y buckets por día/semana)
+"""
+
+from datetime import date, timedelta
+
+from .prescriptions import routine_volume
+
+AGGREGATES_VERSION = 2
+
+
+def _empty_bucket():
+    return {"workouts": 0, "sessions": 0, "calories": 0.0, "duration": 0.0, "sets": 0, "reps": 0.0}
+
+
+def empty_aggregates():
+    state = _empty_bucket()
+    state.update({"version": AGGREGATES_VERSION, "days": {}, "weeks": {}})
+    return state
+
+
+def week_key(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class AggregateCache:
+    """Sumas y conteos que se actualizan con cada alta en lugar de recalcularse.
+
+    El estado es un dict serializable que vive en `data["aggregates"]`, de modo
+    que se persiste junto con los datos en cada snapshot.
+    """
+
+    def __init__(self, state=None):
+        self.state = state if state is not None else empty_aggregates()
+
+    @classmethod
+    def for_document(cls, data):
+        """Enlaza el agregado guardado en el documento y lo pone al día.
+
+        Las colecciones solo crecen por el final, así que basta con añadir los
+        registros posteriores a los ya contados (p. ej. los del journal).
+        """
+        state = data.get("aggregates")
+        if (not isinstance(state, dict)
+                or state.get("version") != AGGREGATES_VERSION
+                or state["workouts"] > len(data["workouts"])
+                or state["sessions"] > len(data["progress"])):
+            state = empty_aggregates()
+
+        cache = cls(state)
+        for workout in data["workouts"][state["workouts"]:]:
+            cache.add("workouts", workout)
+        for session in data["progress"][state["sessions"]:]:
+            cache.add("progress", session)
+
+        data["aggregates"] = cache.state
+        return cache
+
+    def add(self, collection, record):
+        increment = _empty_bucket()
+        if collection == "workouts":
+            increment["workouts"] = 1
+            # Volumen de la rutina guardada (prescripciones compiladas y cacheadas)
+            volume = routine_volume(record.get("exercises"), record.get("type", "fuerza"))
+            increment["sets"] = volume["sets"]
+            increment["reps"] = volume["reps"]
+        else:
+            increment["sessions"] = 1
+            increment["calories"] = record.get("calories", 0) or 0
+            increment["duration"] = record.get("duration", 0) or 0
+
+        buckets = [self.state]
+        day = self._record_day(record)
+        if day is not None:
+            buckets.append(self.state["days"].setdefault(day.isoformat(), _empty_bucket()))
+            buckets.append(self.state["weeks"].setdefault(week_key(day), _empty_bucket()))
+
+        for bucket in buckets:
+            for key, value in increment.items():
+                bucket[key] += value
+
+    def merge(self, other):
+        """Suma los totales y buckets de otro agregado (p. ej. de un trozo procesado aparte)"""
+        for key in _empty_bucket():
+            self.state[key] += other.state[key]
+        for period in ("days", "weeks"):
+            buckets = self.state[period]
+            for name, bucket in other.state[period].items():
+                target = buckets.setdefault(name, _empty_bucket())
+                for key, value in bucket.items():
+                    target[key] += value
+        return self
+
+    @staticmethod
+    def _record_day(record):
+        try:
+            return date.fromisoformat(str(record.get("date", ""))[:10])
+        except ValueError:
+            return None
+
+    def totals(self):
+        """Totales históricos: entrenamientos, sesiones, calorías, minutos y volumen"""
+        return {key: self.state[key] for key in _empty_bucket()}
+
+    def window(self, days, today=None):
+        """Totales de los últimos `days` días naturales (incluido hoy)"""
+        today = today or date.today()
+        totals = _empty_bucket()
+        for offset in range(days):
+            bucket = self.state["days"].get((today - timedelta(days=offset)).isoformat())
+            if bucket:
+                for key in totals:
+                    totals[key] += bucket[key]
+        return totals
+
+    def week(self, day=None):
+        """Totales de la semana ISO que contiene `day`"""
+        return dict(self.state["weeks"].get(week_key(day or date.today()), _empty_bucket()))
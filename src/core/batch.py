@@ -0,0 +1,129 @@
+"""
+Trabajos por lotes sin interfaz: rutinas, recálculo de calorías y agregados
+"""
+
+import json
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from .aggregates import AggregateCache
+from .calories import MetModel
+from .catalog import DEFAULT_CATALOG_FILE, LEVELS, WORKOUT_TYPES, load_catalog
+from .importers import batched
+from .routines import RoutineEngine
+
+# Modelo MET de cada proceso del pool (ver _init_model)
+_model = None
+
+
+def _init_model(met_values):
+    global _model
+    _model = MetModel(met_values)
+
+
+def parallel_map(func, chunks, workers=None, initializer=None, initargs=()):
+    """`func` sobre cada trozo, en orden y en streaming.
+
+    Con un solo trozo (entrada pequeña) o `workers` == 1 todo ocurre en este
+    proceso. Si no, se reparte en un pool de procesos con como mucho
+    2 × workers trozos en vuelo, de modo que una entrada enorme (p. ej. stdin)
+    no se carga entera en memoria.
+    """
+    chunks = iter(chunks)
+    head = list(islice(chunks, 2))
+    workers = workers or os.cpu_count() or 1
+
+    if len(head) < 2 or workers == 1:
+        if initializer:
+            initializer(*initargs)
+        for chunk in chain(head, chunks):
+            yield func(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        for chunk in chain(head, chunks):
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def routine_specs(count, seed=0, workout_type=None, level=None, duration=None):
+    """(id, tipo, nivel, duración, semilla) de cada rutina; lo que no se fija se sortea con `seed`"""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield (
+            index,
+            workout_type or rng.choice(WORKOUT_TYPES),
+            level or rng.choice(LEVELS),
+            duration or rng.randrange(10, 95, 5),
+            seed + index
+        )
+
+
+def _routine_chunk(args):
+    catalog_file, specs = args
+    # Cada proceso carga el catálogo una vez gracias a load_catalog
+    engine = RoutineEngine(load_catalog(catalog_file))
+    lines = []
+    for index, workout_type, level, duration, seed in specs:
+        # Sin pasar por la caché de semillas: aquí cada semilla se usa una sola vez
+        exercises = engine._generate(workout_type, level, duration, seed)
+        lines.append(json.dumps({
+            "id": index,
+            "type": workout_type,
+            "level": level,
+            "duration": duration,
+            "seed": seed,
+            "minutes": round(sum(item["minutes"] for item in exercises), 1),
+            "exercises": exercises
+        }, ensure_ascii=False))
+    return lines
+
+
+def generate_routines(count, seed=0, workout_type=None, level=None, duration=None,
+                      catalog_file=DEFAULT_CATALOG_FILE, workers=None, chunk_size=1000):
+    """Líneas JSON con `count` rutinas reproducibles (la rutina i usa la semilla seed + i)"""
+    specs = routine_specs(count, seed, workout_type, level, duration)
+    chunks = ((catalog_file, chunk) for chunk in batched(specs, chunk_size))
+    for lines in parallel_map(_routine_chunk, chunks, workers):
+        yield from lines
+
+
+def _recalc_chunk(args):
+    records, only_missing = args
+    targets = [r for r in records if not only_missing or r.get("calories") is None]
+    if targets:
+        # Igual que DatabaseManager.recompute_calories: lo desconocido conserva su valor
+        for record, calories in zip(targets, _model.estimate_records(targets).tolist()):
+            if math.isfinite(calories):
+                record["calories"] = calories
+    return records
+
+
+def recompute_calories(records, met_values, only_missing=False, workers=None, chunk_size=20000):
+    """Las sesiones de `records` con las calorías reestimadas, en el mismo orden"""
+    chunks = ((chunk, only_missing) for chunk in batched(records, chunk_size))
+    for chunk in parallel_map(_recalc_chunk, chunks, workers, _init_model, (met_values,)):
+        yield from chunk
+
+
+def _aggregate_chunk(entries):
+    cache = AggregateCache()
+    for collection, record in entries:
+        cache.add(collection, record)
+    return cache.state
+
+
+def aggregate(entries, workers=None, chunk_size=50000):
+    """AggregateCache de pares (colección, registro), sumando los agregados parciales de cada trozo"""
+    cache = AggregateCache()
+    for state in parallel_map(_aggregate_chunk, batched(entries, chunk_size), workers):
+        cache.merge(AggregateCache(state))
+    return cache
@@ -0,0 +1,32 @@
+"""
+Índice de masa corporal (IMC) y peso de referencia
+"""
+
+# Límite superior (exclusivo) de cada categoría de la OMS
+BMI_CATEGORIES = [
+    (18.5, "Bajo peso", "🔵"),
+    (25, "Peso normal", "🟢"),
+    (30, "Sobrepeso", "🟡"),
+    (float("inf"), "Obesidad", "🔴")
+]
+IDEAL_BMI = 22
+
+
+def calculate_bmi(weight, height):
+    """IMC con el peso en kg y la altura en metros, redondeado a 2 decimales"""
+    if height <= 0:
+        raise ValueError(f"Altura no válida: {height}")
+    return round(weight / (height ** 2), 2)
+
+
+def bmi_category(bmi):
+    """(categoría, emoji) del IMC"""
+    for limit, category, emoji in BMI_CATEGORIES:
+        if bmi < limit:
+            return category, emoji
+    return BMI_CATEGORIES[-1][1:]
+
+
+def ideal_weight(height, bmi=IDEAL_BMI):
+    """Peso aproximado (kg) con el que la altura en metros da el IMC indicado"""
+    return bmi * (height ** 2)
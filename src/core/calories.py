@@ -0,0 +1,192 @@
+"""
+Estimación vectorizada de calorías: tabla (actividad, intensidad) y modelo MET
+"""
+
+import numpy as np
+import pandas as pd
+
+# Las tasas de la tabla están referidas a una persona de 70 kg
+REFERENCE_WEIGHT = 70
+
+# 1 MET = 3.5 ml O2/kg/min; 1 litro de O2 ≈ 5 kcal
+ML_O2_PER_MET = 3.5
+KCAL_PER_LITER_O2 = 5.0
+
+# Mifflin-St Jeor: término por sexo y altura por defecto si no se indica
+SEX_OFFSET = {"M": 5.0, "F": -161.0}
+REFERENCE_HEIGHT = {"M": 175.0, "F": 162.0}
+
+# Rejillas precalculadas para la calculadora interactiva
+WEIGHT_GRID = np.arange(30, 201)
+DURATION_GRID = np.arange(0, 241)
+
+
+class CalorieTable:
+    """Tabla NumPy de kcal/min indexada por (actividad, intensidad).
+
+    Se construye una vez a partir de un dict {actividad: {intensidad: kcal/min}}
+    (p. ej. CALORIES_PER_MINUTE). Las combinaciones desconocidas dan NaN, de
+    modo que una estimación sobre miles de sesiones es una sola indexación y
+    una multiplicación de arrays.
+    """
+
+    def __init__(self, rates):
+        self.activities = list(rates)
+        self.intensities = []
+        for levels in rates.values():
+            for intensity in levels:
+                if intensity not in self.intensities:
+                    self.intensities.append(intensity)
+
+        self.activity_index = {name: i for i, name in enumerate(self.activities)}
+        self.intensity_index = {name: i for i, name in enumerate(self.intensities)}
+
+        self.table = np.full((len(self.activities), len(self.intensities)), np.nan)
+        for activity, levels in rates.items():
+            for intensity, rate in levels.items():
+                self.table[self.activity_index[activity], self.intensity_index[intensity]] = rate
+
+    @staticmethod
+    def codes(labels, categories):
+        """Códigos de la tabla para una secuencia de etiquetas (-1 si no existe)"""
+        return pd.Categorical(labels, categories=categories).codes.astype(np.int64)
+
+    def rates(self, activity_codes, intensity_codes):
+        """kcal/min para arrays de códigos; NaN donde alguno es desconocido"""
+        activity_codes = np.asarray(activity_codes)
+        intensity_codes = np.asarray(intensity_codes)
+        valid = (activity_codes >= 0) & (intensity_codes >= 0)
+        rates = np.full(activity_codes.shape, np.nan)
+        rates[valid] = self.table[activity_codes[valid], intensity_codes[valid]]
+        return rates
+
+    def estimate_many(self, activities, intensities, durations, weights=REFERENCE_WEIGHT):
+        """Calorías de muchas sesiones a la vez (arrays o listas del mismo largo)"""
+        rates = self.rates(
+            self.codes(activities, self.activities),
+            self.codes(intensities, self.intensities)
+        )
+        durations = np.asarray(durations, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        return rates * durations * (weights / REFERENCE_WEIGHT)
+
+    def estimate(self, activity, intensity, duration, weight=REFERENCE_WEIGHT):
+        """Calorías de una sola sesión (consulta directa, sin arrays)"""
+        a = self.activity_index.get(activity)
+        i = self.intensity_index.get(intensity)
+        if a is None or i is None:
+            return float("nan")
+        return float(self.table[a, i] * duration * (weight / REFERENCE_WEIGHT))
+
+    def estimate_records(self, records, default_weight=REFERENCE_WEIGHT):
+        """Calorías de una lista de sesiones guardadas (dicts de `progress`)"""
+        return self.estimate_many(
+            [r.get("activity") for r in records],
+            [r.get("intensity") for r in records],
+            [_number(r.get("duration")) for r in records],
+            [_number(r.get("weight"), default_weight) for r in records]
+        )
+
+
+def rmr_factor(weights, ages, sexes, heights=None):
+    """Corrección del MET estándar según el metabolismo basal estimado.
+
+    El MET supone 3.5 ml O2/kg/min en reposo; con edad y sexo se estima el
+    gasto basal real (Mifflin-St Jeor) y se devuelve 3.5 / VO2 en reposo.
+    Donde falta algún dato el factor es 1.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    ages = np.asarray(ages, dtype=np.float64)
+    sexes = pd.Series(np.asarray(sexes, dtype=object).ravel())
+    offsets = sexes.map(SEX_OFFSET).to_numpy(dtype=np.float64).reshape(np.shape(ages) or ())
+    default_heights = sexes.map(REFERENCE_HEIGHT).to_numpy(dtype=np.float64).reshape(np.shape(ages) or ())
+    if heights is None:
+        heights = default_heights
+    else:
+        heights = np.asarray(heights, dtype=np.float64)
+        heights = np.where(np.isnan(heights), default_heights, heights)
+
+    rmr_kcal_day = 10 * weights + 6.25 * heights - 5 * ages + offsets
+    resting_vo2 = rmr_kcal_day * 1000 / (1440 * KCAL_PER_LITER_O2 * weights)
+    factor = ML_O2_PER_MET / resting_vo2
+    return np.where(np.isfinite(factor) & (factor > 0), factor, 1.0)
+
+
+class MetModel(CalorieTable):
+    """Gasto energético a partir de METs: kcal/min = MET × 3.5 × kg / 200.
+
+    Comparte la API de CalorieTable (la tabla interna son las kcal/min a
+    70 kg), añade la corrección opcional por edad/sexo y rejillas
+    peso × duración precalculadas para recalcular al instante en la UI.
+    """
+
+    def __init__(self, met_values):
+        self.mets = met_values
+        super().__init__({
+            activity: {
+                intensity: met * ML_O2_PER_MET * REFERENCE_WEIGHT / 1000 * KCAL_PER_LITER_O2
+                for intensity, met in levels.items()
+            }
+            for activity, levels in met_values.items()
+        })
+        self._grids = {}
+
+    def met(self, activity, intensity):
+        return self.mets.get(activity, {}).get(intensity)
+
+    def estimate_many(self, activities, intensities, durations, weights=REFERENCE_WEIGHT,
+                      ages=None, sexes=None, heights=None):
+        calories = super().estimate_many(activities, intensities, durations, weights)
+        if ages is not None and sexes is not None:
+            weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), calories.shape)
+            calories = calories * rmr_factor(weights, ages, sexes, heights)
+        return calories
+
+    def estimate(self, activity, intensity, duration, weight=REFERENCE_WEIGHT,
+                 age=None, sex=None, height=None):
+        calories = self.lookup(activity, intensity, duration, weight)
+        if age is not None and sex is not None:
+            calories *= float(rmr_factor(weight, age, sex, np.nan if height is None else height))
+        return calories
+
+    def estimate_records(self, records, default_weight=REFERENCE_WEIGHT):
+        return self.estimate_many(
+            [r.get("activity") for r in records],
+            [r.get("intensity") for r in records],
+            [_number(r.get("duration")) for r in records],
+            [_number(r.get("weight"), default_weight) for r in records],
+            ages=[_number(r.get("age")) for r in records],
+            sexes=[r.get("sex") for r in records],
+            heights=[_number(r.get("height")) for r in records]
+        )
+
+    def grid(self, activity, intensity):
+        """kcal para cada (peso, duración) de WEIGHT_GRID × DURATION_GRID; se cachea"""
+        key = (activity, intensity)
+        if key not in self._grids:
+            rate = self.table[self.activity_index[activity], self.intensity_index[intensity]]
+            self._grids[key] = np.outer(WEIGHT_GRID / REFERENCE_WEIGHT * rate, DURATION_GRID)
+        return self._grids[key]
+
+    def lookup(self, activity, intensity, duration, weight=REFERENCE_WEIGHT):
+        """Calorías sin corrección: lectura de la rejilla si peso y duración son enteros en rango"""
+        if activity not in self.activity_index or intensity not in self.intensity_index:
+            return float("nan")
+        w = int(weight) - WEIGHT_GRID[0]
+        d = int(duration) - DURATION_GRID[0]
+        if (w == weight - WEIGHT_GRID[0] and d == duration - DURATION_GRID[0]
+                and 0 <= w < len(WEIGHT_GRID) and 0 <= d < len(DURATION_GRID)):
+            return float(self.grid(activity, intensity)[w, d])
+        return super().estimate(activity, intensity, duration, weight)
+
+    def duration_curve(self, activity, intensity, weight=REFERENCE_WEIGHT):
+        """(duraciones, kcal) para un peso: una fila de la rejilla"""
+        w = min(max(int(round(weight)) - WEIGHT_GRID[0], 0), len(WEIGHT_GRID) - 1)
+        return DURATION_GRID, self.grid(activity, intensity)[w]
+
+
+def _number(value, default=np.nan):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,120 @@
+"""
+Catálogo de ejercicios: se carga una vez por proceso desde data/exercises.json
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from .facets import FacetIndex
+from .prescriptions import parse_prescription
+from .search import SearchIndex
+
+DEFAULT_CATALOG_FILE = Path(__file__).parent / "data" / "exercises.json"
+
+LEVELS = ["principiante", "intermedio", "avanzado"]
+WORKOUT_TYPES = ["fuerza", "cardio", "flexibilidad"]
+
+# Facetas filtrables: nombre -> valores de cada ejercicio
+EXERCISE_FACETS = {
+    "source": lambda e: [e["source"]],
+    "type": lambda e: [e["type"]],
+    "difficulty": lambda e: [e["difficulty"]],
+    "muscle_group": lambda e: [e["muscle_group"]] if e["muscle_group"] else [],
+    "equipment": lambda e: e["equipment_tags"],
+    "muscle": lambda e: e["muscle_tags"]
+}
+
+
+def slugify(text):
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _split_tags(text, separator):
+    return [part.strip() for part in (text or "").split(separator) if part.strip()]
+
+
+def normalize_exercise(raw):
+    """Completa un ejercicio del fichero con el esquema común del catálogo"""
+    exercise = {
+        "name": raw["name"],
+        "source": raw.get("source", "rutinas"),
+        "type": raw.get("type", "fuerza"),
+        "level": raw.get("level", "principiante"),
+        "muscle_group": raw.get("muscle_group"),
+        "equipment": raw.get("equipment", "Peso corporal"),
+        "muscles": raw.get("muscles", raw.get("description", "")),
+        "description": raw.get("description", "Ejercicio funcional"),
+        "tips": raw.get("tips", ""),
+        "sets": raw.get("sets"),
+        "duration": raw.get("duration"),
+        "intensity": raw.get("intensity"),
+        "style": raw.get("style")
+    }
+    exercise["id"] = raw.get("id") or slugify(
+        f"{exercise['source']}-{exercise['muscle_group'] or exercise['type']}-"
+        f"{exercise['level']}-{exercise['name']}"
+    )
+    exercise["difficulty"] = exercise["level"].capitalize()
+    # Texto de la prescripción tal como se muestra ("3x8-12", "20-30 min"...)
+    exercise["prescription"] = exercise["sets"] or exercise["duration"] or "Ver descripción"
+    exercise["parsed"] = parse_prescription(exercise["prescription"])
+    exercise["equipment_tags"] = _split_tags(exercise["equipment"], "/")
+    exercise["muscle_tags"] = [m.lower() for m in _split_tags(exercise["muscles"], ",")]
+    return exercise
+
+
+class ExerciseCatalog:
+    """Ejercicios normalizados e índices de búsqueda construidos al cargar"""
+
+    def __init__(self, muscle_groups, exercises):
+        self.exercises = [normalize_exercise(raw) for raw in exercises]
+        self.by_id = {}
+        self.by_type_level = {}
+        self.by_muscle_group = {}
+
+        for exercise in self.exercises:
+            if exercise["id"] in self.by_id:
+                raise ValueError(f"Ejercicio duplicado en el catálogo: {exercise['id']}")
+            self.by_id[exercise["id"]] = exercise
+
+            if exercise["source"] == "rutinas":
+                key = (exercise["type"], exercise["level"])
+                self.by_type_level.setdefault(key, []).append(exercise)
+            if exercise["muscle_group"]:
+                self.by_muscle_group.setdefault(exercise["muscle_group"], []).append(exercise)
+
+        self.facets = FacetIndex(self.exercises, EXERCISE_FACETS)
+        self.search_index = SearchIndex(self.exercises)
+
+        # Metadatos de cada grupo muscular con su lista de ejercicios
+        self.muscle_groups = {}
+        for key, group in muscle_groups.items():
+            self.muscle_groups[key] = dict(group, exercises=self.by_muscle_group.get(key, []))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding="utf-8") as f:
+            document = json.load(f)
+        return cls(document.get("muscle_groups", {}), document["exercises"])
+
+    def routine_exercises(self, workout_type, level):
+        """Ejercicios del generador de rutinas para un tipo y nivel"""
+        return self.by_type_level.get((workout_type, level), [])
+
+    def muscle_exercises(self, muscle_key):
+        return self.by_muscle_group.get(muscle_key, [])
+
+    def search(self, query, limit=10):
+        """Ejercicios que coinciden con `query` (sin distinguir acentos), por relevancia"""
+        return [exercise for exercise, _ in self.search_index.search(query, limit=limit)]
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path=DEFAULT_CATALOG_FILE):
+    """Catálogo compartido por el proceso (se lee y se indexa una sola vez)"""
+    return ExerciseCatalog.from_file(path)
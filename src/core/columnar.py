@@ -0,0 +1,128 @@
+"""
+Almacén columnar en memoria para las sesiones de progreso
+"""
+
+import numpy as np
+import pandas as pd
+
+from .importers import normalize_date
+
+DATE_DTYPE = "datetime64[us]"
+
+
+def _parse_date(value):
+    """Fecha en hora local sin zona, con la misma regla que los importadores"""
+    return np.datetime64(normalize_date(value) or "NaT", "us")
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _Categories:
+    """Codificación categórica incremental (texto -> código int16)"""
+
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def code(self, label):
+        if label is None:
+            return -1
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class ProgressColumns:
+    """Sesiones de progreso como arrays NumPy tipados.
+
+    Las fechas se parsean una sola vez al construir o añadir, las actividades e
+    intensidades se guardan como códigos categóricos y los arrays crecen por
+    duplicación, así que `append` es O(1) amortizado. `to_frame()` devuelve un
+    DataFrame que se reutiliza hasta el siguiente alta.
+    """
+
+    def __init__(self, capacity=256):
+        self.size = 0
+        self.dates = np.empty(capacity, dtype=DATE_DTYPE)
+        self.durations = np.empty(capacity, dtype=np.float64)
+        self.calories = np.empty(capacity, dtype=np.float64)
+        self.activity_codes = np.empty(capacity, dtype=np.int16)
+        self.intensity_codes = np.empty(capacity, dtype=np.int16)
+        self.activities = _Categories()
+        self.intensities = _Categories()
+        self._frame = None
+
+    @classmethod
+    def from_records(cls, records):
+        """Construye las columnas de una vez a partir de la lista de dicts"""
+        size = len(records)
+        columns = cls(capacity=max(256, size))
+        if not size:
+            return columns
+
+        try:
+            dates = pd.to_datetime(
+                pd.Series([r.get("date") for r in records], dtype="object"),
+                format="ISO8601", errors="coerce"
+            )
+        except ValueError:
+            dates = None
+        if dates is not None and pd.api.types.is_datetime64_dtype(dates):
+            columns.dates[:size] = dates.to_numpy(dtype=DATE_DTYPE)
+        else:
+            # Alguna fecha con zona horaria: una a una, igual que en append()
+            columns.dates[:size] = [_parse_date(r.get("date")) for r in records]
+        columns.durations[:size] = [_number(r.get("duration")) for r in records]
+        columns.calories[:size] = [_number(r.get("calories")) for r in records]
+        columns.activity_codes[:size] = [columns.activities.code(r.get("activity")) for r in records]
+        columns.intensity_codes[:size] = [columns.intensities.code(r.get("intensity")) for r in records]
+        columns.size = size
+        return columns
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        capacity = len(self.dates) * 2
+        for name in ("dates", "durations", "calories", "activity_codes", "intensity_codes"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, record):
+        if self.size == len(self.dates):
+            self._grow()
+
+        i = self.size
+        self.dates[i] = _parse_date(record.get("date"))
+        self.durations[i] = _number(record.get("duration"))
+        self.calories[i] = _number(record.get("calories"))
+        self.activity_codes[i] = self.activities.code(record.get("activity"))
+        self.intensity_codes[i] = self.intensities.code(record.get("intensity"))
+        self.size += 1
+        self._frame = None
+
+    def to_frame(self):
+        """DataFrame (date, activity, duration, intensity, calories) listo para graficar"""
+        if self._frame is None:
+            n = self.size
+            self._frame = pd.DataFrame({
+                "date": self.dates[:n],
+                "activity": pd.Categorical.from_codes(
+                    self.activity_codes[:n], categories=list(self.activities.labels)
+                ),
+                "duration": self.durations[:n],
+                "intensity": pd.Categorical.from_codes(
+                    self.intensity_codes[:n], categories=list(self.intensities.labels)
+                ),
+                "calories": self.calories[:n]
+            })
+        return self._frame
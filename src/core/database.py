@@ -0,0 +1,360 @@
+"""
+Gestor de datos del usuario: documento en memoria, índices y escrituras agrupadas
+"""
+
+import json
+import logging
+import math
+import numbers
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import numpy as np
+
+from .aggregates import AggregateCache
+from .columnar import ProgressColumns
+from .instrumentation import metrics, storage_bytes
+from .query import DateIndex, iter_query, query_page
+from .storage import create_storage, empty_document
+
+logger = logging.getLogger(__name__)
+
+# Claves de DATABASE_CONFIG que configuran el motor de almacenamiento
+STORAGE_OPTIONS = ("engine", "compact_every", "compact_ratio", "backup_enabled", "backup_interval")
+
+# Campos que los agregados y las columnas suman como números
+NUMERIC_FIELDS = {
+    "workouts": ("duration",),
+    "progress": ("duration", "calories", "weight", "distance_km")
+}
+
+
+def _json_default(value):
+    # Escalares NumPy como números; el resto (p. ej. datetime) como texto
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def prepare_records(collection, records):
+    """Copia de `records` tal como quedará guardada, o ValueError si alguno no es válido.
+
+    Se valida y serializa antes de escribir para que un registro erróneo no
+    llegue al almacenamiento ni deje la memoria distinta de lo guardado.
+    """
+    if collection not in NUMERIC_FIELDS:
+        raise ValueError(f"Colección desconocida: {collection}")
+    for record in records:
+        if not isinstance(record, dict):
+            raise ValueError(f"Los registros de {collection} deben ser objetos")
+        for field in NUMERIC_FIELDS[collection]:
+            value = record.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Real)
+                                      or not math.isfinite(value)):
+                raise ValueError(f"'{field}' debe ser numérico: {value!r}")
+        if collection == "workouts" and not isinstance(record.get("exercises") or [], list):
+            raise ValueError("'exercises' debe ser una lista")
+    return json.loads(json.dumps(records, default=_json_default))
+
+
+class DatabaseManager:
+    """Datos de un usuario sobre cualquier motor de almacenamiento, sin interfaz.
+
+    Un fichero ilegible no interrumpe a quien llama: se registra en el log y
+    el error queda en `last_error` para que la interfaz pueda mostrarlo. Las
+    altas que no se pueden guardar sí lanzan la excepción a quien las pidió.
+    """
+
+    def __init__(self, data_file="fitness_data.json", engine="journal", compact_every=500, compact_ratio=0.5,
+                 backup_enabled=False, backup_interval=24):
+        self.data_file = data_file
+        self.storage = create_storage(
+            data_file,
+            engine=engine,
+            compact_every=compact_every,
+            compact_ratio=compact_ratio,
+            backup_enabled=backup_enabled,
+            backup_interval=backup_interval
+        )
+        self.last_error = None
+        # Una misma instancia se comparte entre sesiones (ver get_database)
+        self.lock = threading.RLock()
+        # Cola del group commit y lote en curso de cada hilo (ver batch)
+        self._queue_lock = threading.Lock()
+        self._queue = []
+        self._local = threading.local()
+        self.load_data()
+
+    @classmethod
+    def from_config(cls, data_file, config):
+        """Instancia con las opciones de almacenamiento de un dict como DATABASE_CONFIG"""
+        return cls(data_file, **{key: config[key] for key in STORAGE_OPTIONS if key in config})
+
+    def _report(self, message, error):
+        logger.error("%s (%s): %s", message, self.data_file, error)
+        self.last_error = f"{message}: {error}"
+
+    def load_data(self):
+        with self.lock, self.storage.locked(), metrics.timed("db.load") as timing:
+            try:
+                self.data = self.storage.load()
+            except (OSError, ValueError) as e:
+                # El fichero ilegible ya se apartó; se empieza con datos vacíos
+                self._report("Error cargando datos", e)
+                self.data = empty_document()
+            if self.storage.recovery:
+                self._report("Datos recuperados", self.storage.recovery)
+            self.aggregates = AggregateCache.for_document(self.data)
+            # Se reconstruyen bajo demanda en get_progress_frame() y _index()
+            self.progress_columns = None
+            self.indexes = {}
+            self.signature = self.storage.signature()
+            timing["bytes_read"] = storage_bytes(self.signature)
+            timing["records"] = len(self.data["workouts"]) + len(self.data["progress"])
+
+    def refresh_if_changed(self):
+        """Se pone al día si el fichero cambió en disco (mtime/tamaño).
+
+        Si el motor puede dar solo lo que otros procesos añadieron (la cola
+        del journal), se incorpora con _apply; si no, se recarga todo.
+        """
+        with self.lock:
+            if self.storage.signature() == self.signature:
+                return
+        # Bajo el bloqueo del fichero nadie escribe mientras se lee la cola
+        with self.lock, self.storage.locked():
+            signature = self.storage.signature()
+            if signature == self.signature:
+                return
+            entries = self.storage.tail(self.signature)
+            if entries is None:
+                self.load_data()
+                return
+            by_collection = {}
+            for collection, record in entries:
+                if collection in self.data:
+                    by_collection.setdefault(collection, []).append(record)
+            for collection, records in by_collection.items():
+                self._apply(collection, records)
+            self.signature = signature
+
+    def save_data(self):
+        with self.lock, self.storage.locked(), metrics.timed("db.save") as timing:
+            try:
+                self.storage.save(self.data)
+            except Exception as e:
+                self._report("Error guardando datos", e)
+            self.signature = self.storage.signature()
+            timing["bytes_written"] = storage_bytes(self.signature)
+
+    def _apply(self, collection, records):
+        """Incorpora a memoria registros ya guardados (índice, agregados y columnas)"""
+        index = self.indexes.get(collection)
+        if index is not None:
+            for position, record in enumerate(records, len(self.data[collection])):
+                index.add(record, position)
+        self.data[collection].extend(records)
+        for record in records:
+            self.aggregates.add(collection, record)
+            if collection == "progress" and self.progress_columns is not None:
+                self.progress_columns.append(record)
+
+    def _flush(self, tickets):
+        """Escribe los lotes encolados, una escritura por colección, y resuelve sus turnos.
+
+        Cada colección se guarda primero y solo después se incorpora a memoria,
+        así que un fallo deja la memoria igual que el almacenamiento. Los turnos
+        con algún registro sin guardar reciben la excepción.
+        """
+        by_collection = {}
+        for _, entries in tickets:
+            for collection, record in entries:
+                by_collection.setdefault(collection, []).append(record)
+
+        errors = {}
+        try:
+            # Lectura-modificación-escritura bajo el bloqueo del fichero: primero
+            # se incorporan los registros que otros procesos hayan añadido
+            with self.lock, self.storage.locked(), metrics.timed("db.append", records=sum(
+                    len(records) for records in by_collection.values())) as timing:
+                self.refresh_if_changed()
+                size_before = storage_bytes(self.signature)
+                for collection, records in by_collection.items():
+                    try:
+                        self.storage.append_many(collection, records, self.data)
+                    except Exception as e:
+                        logger.error("Error guardando datos (%s): %s", self.data_file, e)
+                        errors[collection] = e
+                        continue
+                    self._apply(collection, records)
+                self.signature = self.storage.signature()
+                # Con compactación el tamaño puede bajar; se informa del crecimiento neto
+                timing["bytes_delta"] = storage_bytes(self.signature) - size_before
+        except Exception as e:
+            # Fallo fuera de las escrituras (bloqueo, recarga): nadie queda confirmado
+            for ticket, _ in tickets:
+                if not ticket.done():
+                    ticket.set_exception(e)
+            return
+
+        for ticket, entries in tickets:
+            error = next((errors[collection] for collection, _ in entries if collection in errors), None)
+            if error is None:
+                ticket.set_result(None)
+            else:
+                ticket.set_exception(error)
+
+    def _commit(self, entries):
+        """Group commit: quien obtiene el bloqueo escribe también lo que otros encolaron.
+
+        Cada llamada encola sus registros con un turno (Future). Mientras una
+        sesión escribe, las demás esperan en `self.lock`; la siguiente en entrar
+        vacía la cola completa de una vez y resuelve todos los turnos, así que
+        las que llegan después lo encuentran resuelto y vuelven sin escribir.
+        Si la escritura falla, cada una recibe la excepción.
+        """
+        ticket = Future()
+        with self._queue_lock:
+            self._queue.append((ticket, entries))
+
+        with self.lock:
+            if not ticket.done():
+                with self._queue_lock:
+                    pending, self._queue = self._queue, []
+                self._flush(pending)
+        ticket.result()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa las altas del bloque y las escribe juntas al salir.
+
+        Si el bloque lanza una excepción no se escribe nada. Las lecturas
+        dentro del bloque todavía no ven los registros pendientes.
+        """
+        if getattr(self._local, "batch", None) is not None:
+            # Lote anidado: se suma al exterior
+            yield self
+            return
+
+        self._local.batch = staged = []
+        try:
+            yield self
+        finally:
+            self._local.batch = None
+        if staged:
+            self._commit(staged)
+
+    def add_many(self, collection, records):
+        """Alta de varios registros con una sola escritura en el almacenamiento.
+
+        Lanza ValueError si algún registro no es válido (no se guarda ninguno)
+        y la excepción del almacenamiento si la escritura falla.
+        """
+        entries = [(collection, record) for record in prepare_records(collection, records)]
+        staged = getattr(self._local, "batch", None)
+        if staged is not None:
+            staged.extend(entries)
+        elif entries:
+            self._commit(entries)
+
+    def add_workout(self, workout):
+        self.add_many("workouts", [workout])
+
+    def add_progress(self, progress):
+        self.add_many("progress", [progress])
+
+    def add_progress_many(self, records):
+        self.add_many("progress", records)
+
+    def get_workouts(self):
+        return self.data["workouts"]
+
+    def get_progress(self):
+        return self.data["progress"]
+
+    def get_progress_frame(self):
+        """DataFrame columnar del progreso, sin reconvertir dicts en cada rerun"""
+        with self.lock:
+            if self.progress_columns is None:
+                self.progress_columns = ProgressColumns.from_records(self.data["progress"])
+            return self.progress_columns.to_frame()
+
+    def recompute_calories(self, calorie_table, only_missing=False):
+        """Recalcula `calories` de todo el historial de progreso en una pasada.
+
+        La estimación es vectorizada; las sesiones con actividad o intensidad
+        desconocidas conservan su valor. Devuelve cuántas sesiones cambiaron.
+        El documento nuevo se prepara aparte y solo sustituye al de memoria si
+        se guarda; si no, la excepción llega a quien llama y nada cambia.
+        """
+        with self.lock, self.storage.locked():
+            self.refresh_if_changed()
+            progress = self.data["progress"]
+            estimates = calorie_table.estimate_records(progress)
+
+            mask = np.isfinite(estimates)
+            if only_missing:
+                mask &= np.array([r.get("calories") is None for r in progress], dtype=bool)
+
+            indices = np.flatnonzero(mask)
+            if not len(indices):
+                return 0
+
+            updated = list(progress)
+            for i, calories in zip(indices.tolist(), estimates[indices].tolist()):
+                updated[i] = dict(progress[i], calories=calories)
+            # Las calorías cambiaron: se rehacen los agregados sobre la copia
+            data = dict(self.data, progress=updated, aggregates=None)
+            aggregates = AggregateCache.for_document(data)
+
+            with metrics.timed("db.save") as timing:
+                self.storage.save(data)
+                self.signature = self.storage.signature()
+                timing["bytes_written"] = storage_bytes(self.signature)
+
+            # Mismas fechas en las mismas posiciones: los índices siguen valiendo
+            self.data = data
+            self.aggregates = aggregates
+            self.progress_columns = None
+            return len(indices)
+
+    def _index(self, collection):
+        """Índice ordenado por fecha de `collection` (se construye al primer uso)"""
+        with self.lock:
+            if collection not in self.data:
+                raise ValueError(f"Colección desconocida: {collection}")
+            if collection not in self.indexes:
+                self.indexes[collection] = DateIndex(self.data[collection])
+            return self.indexes[collection]
+
+    def query(self, collection, start=None, end=None, descending=False, **filters):
+        """Iterador perezoso de registros entre `start` y `end` (incluidos).
+
+        Los filtros comparan campos por igualdad o pertenencia, p. ej.
+        activity="Correr" o intensity=["Alta", "Moderada"].
+        """
+        index = self._index(collection)
+        records = self.data[collection]
+        return (record for _, record in iter_query(records, index, start, end, descending, **filters))
+
+    def query_page(self, collection, limit=50, cursor=None, start=None, end=None, descending=True,
+                   order_by="date", **filters):
+        """Página de resultados ordenada por `order_by` y cursor opaco para pedir la siguiente"""
+        with self.lock:
+            return query_page(self.data[collection], self._index(collection), limit, cursor,
+                              start, end, descending, order_by, **filters)
+
+    def count(self, collection, start=None, end=None):
+        """Registros en un rango de fechas en O(log n)"""
+        return self._index(collection).count(start, end)
+
+    def count_since(self, collection, since):
+        """Registros de `collection` con fecha posterior a `since` (ISO)"""
+        return self._index(collection).count_after(since)
+
+    def get_totals(self):
+        """Totales históricos en O(1): entrenamientos, sesiones, calorías, minutos y volumen"""
+        return self.aggregates.totals()
+
+    def get_recent_totals(self, days=7):
+        """Totales de los últimos `days` días a partir de los buckets diarios"""
+        return self.aggregates.window(days)
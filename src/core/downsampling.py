@@ -0,0 +1,100 @@
+"""
+Reducción de puntos para gráficos: buckets temporales y LTTB
+"""
+
+import numpy as np
+import pandas as pd
+
+# Granularidades disponibles: frecuencia de pandas, días por bucket y etiqueta.
+# Las semanas terminan en domingo (lunes a domingo), como las semanas ISO de
+# los agregados; pandas etiqueta cada bucket con su domingo.
+GRANULARITIES = [
+    ("D", 1, "por día"),
+    ("W-SUN", 7, "por semana"),
+    ("MS", 30, "por mes")
+]
+
+
+def lttb(x, y, threshold):
+    """Índices de los puntos elegidos por Largest-Triangle-Three-Buckets.
+
+    Conserva la forma visual de la serie (picos y valles) con `threshold`
+    puntos; siempre incluye el primero y el último.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Vértice C: media del bucket siguiente (o el último punto)
+        if end < next_end:
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+def choose_granularity(start, end, max_points):
+    """Bucket temporal más fino que deja como mucho `max_points` puntos"""
+    span_days = max((end - start) / pd.Timedelta(days=1), 1)
+    for freq, days, label in GRANULARITIES:
+        if span_days / days <= max_points:
+            return freq, label
+    freq, _, label = GRANULARITIES[-1]
+    return freq, label
+
+
+def calorie_series(frame, start=None, end=None, max_points=500):
+    """Serie de calorías acotada a `max_points` para el rango visible.
+
+    Devuelve (DataFrame con columnas date/calories, etiqueta de granularidad).
+    Si el rango cabe, se devuelven las sesiones tal cual; si no, se agregan
+    en buckets diarios, semanales o mensuales y, si aún sobran puntos, se
+    reducen con LTTB.
+    """
+    visible = frame[["date", "calories"]].dropna()
+    if not visible["date"].is_monotonic_increasing:
+        visible = visible.sort_values("date")
+
+    dates = visible["date"].to_numpy()
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end), side="right")
+    visible = visible.iloc[lo:hi]
+
+    if len(visible) <= max_points:
+        return visible.reset_index(drop=True), "por sesión"
+
+    freq, label = choose_granularity(visible["date"].iloc[0], visible["date"].iloc[-1], max_points)
+    series = (
+        visible.set_index("date")["calories"]
+        .resample(freq).sum()
+        .reset_index()
+    )
+
+    if len(series) > max_points:
+        keep = lttb(series["date"].astype("int64").to_numpy(), series["calories"].to_numpy(), max_points)
+        series = series.iloc[keep].reset_index(drop=True)
+
+    return series, label
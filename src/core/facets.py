@@ -0,0 +1,69 @@
+"""
+Filtrado facetado con listas de postings en forma de bitset
+"""
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+class FacetIndex:
+    """Índice invertido valor -> bitset de elementos para cada faceta.
+
+    El bit `i` de cada bitset (un entero de Python) indica si el elemento `i`
+    tiene ese valor. Dentro de una faceta los valores seleccionados se unen
+    (OR) y entre facetas se intersecan (AND), así que un filtro combinado son
+    unas pocas operaciones sobre enteros en lugar de recorrer la lista.
+    """
+
+    def __init__(self, items, facets):
+        self.items = list(items)
+        self.all_bits = (1 << len(self.items)) - 1
+        self.postings = {facet: {} for facet in facets}
+
+        for i, item in enumerate(self.items):
+            bit = 1 << i
+            for facet, values_of in facets.items():
+                postings = self.postings[facet]
+                for value in values_of(item):
+                    postings[value] = postings.get(value, 0) | bit
+
+    def options(self, facet):
+        return sorted(self.postings[facet])
+
+    def match(self, selections, skip=None):
+        """Bitset de los elementos que cumplen `selections` ({faceta: valores})"""
+        bits = self.all_bits
+        for facet, values in selections.items():
+            if facet == skip or not values:
+                continue
+            postings = self.postings[facet]
+            facet_bits = 0
+            for value in values:
+                facet_bits |= postings.get(value, 0)
+            bits &= facet_bits
+        return bits
+
+    def items_for(self, bits):
+        """Elementos de un bitset, en el orden original"""
+        items = []
+        while bits:
+            lowest = bits & -bits
+            items.append(self.items[lowest.bit_length() - 1])
+            bits ^= lowest
+        return items
+
+    def filter(self, selections):
+        return self.items_for(self.match(selections))
+
+    def counts(self, facet, selections):
+        """Resultados por valor de `facet` aplicando el resto de selecciones.
+
+        Se ignora la selección de la propia faceta para que cada opción
+        muestre cuántos resultados habría al marcarla (multi-selección).
+        """
+        base = self.match(selections, skip=facet)
+        return {
+            value: _popcount(base & bits)
+            for value, bits in self.postings[facet].items()
+        }
@@ -0,0 +1,172 @@
+"""
+Escritura segura de ficheros: renombrado atómico, bloqueo y copias de seguridad
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_dir(path):
+    """Persiste la entrada de directorio tras un rename (solo POSIX)"""
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data):
+    """Escribe en un temporal, hace fsync y lo renombra sobre `path`.
+
+    Un fallo a mitad de escritura deja intacto el fichero anterior.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(path)
+
+
+def append_lines(path, lines):
+    """Añade varias líneas con una sola escritura y un único fsync"""
+    with open(path, 'a') as f:
+        f.write("".join(line + "\n" for line in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class FileLock:
+    """Bloqueo consultivo entre procesos sobre `path + '.lock'`.
+
+    Es reentrante dentro del proceso: DatabaseManager puede recargar datos
+    (que también toma el bloqueo) en mitad de una escritura.
+    """
+
+    def __init__(self, path):
+        self.lock_path = str(path) + ".lock"
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            self._file = open(self.lock_path, 'a+')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+def quarantine(path):
+    """Aparta un fichero corrupto para que la siguiente escritura no lo pise"""
+    target = f"{path}.corrupt-{datetime.now():%Y%m%d%H%M%S}"
+    os.replace(path, target)
+    logger.error("Fichero corrupto %s movido a %s", path, target)
+    return target
+
+
+class BackupPolicy:
+    """Copias periódicas del último snapshot válido (backup_enabled/backup_interval)"""
+
+    def __init__(self, path, enabled=True, interval_hours=24, keep=5):
+        self.path = str(path)
+        self.enabled = enabled
+        self.interval = interval_hours * 3600
+        self.keep = keep
+        self.backup_dir = os.path.join(os.path.dirname(os.path.abspath(self.path)), "backups")
+        name, ext = os.path.splitext(os.path.basename(self.path))
+        self.pattern = os.path.join(self.backup_dir, f"{name}-*{ext}")
+        self._last_backup = None
+
+    def backups(self):
+        """Copias existentes, de la más reciente a la más antigua"""
+        return sorted(glob.glob(self.pattern), reverse=True)
+
+    def maybe_backup(self):
+        """Copia `path` si la última copia es más antigua que el intervalo.
+
+        Solo debe llamarse cuando `path` se acaba de leer o escribir sin errores.
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+
+        if self._last_backup is None:
+            existing = self.backups()
+            self._last_backup = os.path.getmtime(existing[0]) if existing else 0
+        if time.time() - self._last_backup < self.interval:
+            return None
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+        name, ext = os.path.splitext(os.path.basename(self.path))
+        target = os.path.join(self.backup_dir, f"{name}-{datetime.now():%Y%m%d%H%M%S}{ext}")
+        shutil.copyfile(self.path, target)
+        self._last_backup = time.time()
+
+        for old in self.backups()[self.keep:]:
+            os.remove(old)
+        return target
+
+
+def read_json(path, backup_policy=None):
+    """(documento, copia restaurada o None); si está corrupto recurre a la última copia válida.
+
+    El fichero corrupto se aparta para no sobrescribirlo. Si ninguna copia
+    se puede leer se relanza el error original.
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f), None
+    except ValueError as error:
+        logger.error("No se pudo leer %s: %s", path, error)
+        quarantine(path)
+        for backup in (backup_policy.backups() if backup_policy else []):
+            try:
+                with open(backup, 'r') as f:
+                    data = json.load(f)
+            except ValueError:
+                continue
+            logger.warning("Restaurando %s desde la copia %s", path, backup)
+            shutil.copy2(backup, path)
+            return data, backup
+        raise
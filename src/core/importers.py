@@ -0,0 +1,341 @@
+"""
+Importación masiva de sesiones desde exportaciones de wearables (CSV, GPX, TCX)
+"""
+
+import csv
+import math
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from itertools import islice
+
+DEFAULT_INTENSITY = "Moderada"
+
+# Nombres de deporte de los relojes/apps -> actividades de la aplicación
+ACTIVITY_ALIASES = {
+    "running": "Correr",
+    "run": "Correr",
+    "trail_running": "Correr",
+    "jogging": "Trotar",
+    "walking": "Caminar",
+    "walk": "Caminar",
+    "hiking": "Senderismo",
+    "biking": "Ciclismo",
+    "cycling": "Ciclismo",
+    "ride": "Ciclismo",
+    "swimming": "Natación",
+    "swim": "Natación",
+    "rowing": "Remo",
+    "elliptical": "Elíptica",
+    "yoga": "Yoga",
+    "pilates": "Pilates",
+    "strength_training": "Pesas",
+    "weight_training": "Pesas",
+    "hiit": "HIIT",
+    "dance": "Baile",
+    "boxing": "Boxeo",
+    "climbing": "Escalada",
+    "soccer": "Fútbol",
+    "basketball": "Baloncesto",
+    "tennis": "Tenis",
+    "skating": "Patinaje",
+    "cross_country_skiing": "Esquí de fondo"
+}
+
+# Columnas aceptadas en CSV para cada campo del esquema de progreso
+CSV_COLUMNS = {
+    "date": ["date", "fecha", "start_time", "starttime", "start"],
+    "activity": ["activity", "actividad", "sport", "type", "tipo"],
+    "duration": ["duration", "duracion", "duración", "duration_min", "minutes", "minutos"],
+    "duration_s": ["duration_s", "duration_sec", "elapsed_time", "seconds", "segundos"],
+    "intensity": ["intensity", "intensidad"],
+    "calories": ["calories", "calorias", "calorías", "kcal"],
+    "distance_km": ["distance_km", "distancia_km", "distance", "distancia"]
+}
+
+
+class ImportFormatError(ValueError):
+    """El fichero no tiene un formato de importación soportado"""
+
+
+def normalize_activity(name):
+    """Actividad de la aplicación para un nombre de deporte externo"""
+    if not name:
+        return None
+    key = str(name).strip().lower().replace(" ", "_").replace("-", "_")
+    return ACTIVITY_ALIASES.get(key, str(name).strip())
+
+
+def _number(value):
+    """Número finito o None (vacío, texto, nan, inf)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _session(date, activity, duration, intensity=None, calories=None, distance_km=None, source=None):
+    """Registro con el esquema de `progress` (el mismo de CardioPlanner)"""
+    record = {
+        "date": normalize_date(date),
+        "activity": normalize_activity(activity),
+        "duration": round(duration, 2) if duration is not None else None,
+        "intensity": intensity or DEFAULT_INTENSITY,
+        "calories": calories
+    }
+    if distance_km is not None:
+        record["distance_km"] = round(distance_km, 3)
+    if source:
+        record["source"] = source
+    return record
+
+
+def iter_csv(path):
+    """Sesiones de un CSV, fila a fila (csv.DictReader no carga el fichero entero)"""
+    with open(path, newline='', encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        header = {name.strip().lower(): name for name in reader.fieldnames or []}
+        columns = {
+            field: next((header[a] for a in aliases if a in header), None)
+            for field, aliases in CSV_COLUMNS.items()
+        }
+        if columns["date"] is None:
+            raise ImportFormatError("falta la columna de fecha")
+
+        def get(row, field):
+            column = columns[field]
+            return row.get(column) if column else None
+
+        for row in reader:
+            duration = _number(get(row, "duration"))
+            if duration is None and _number(get(row, "duration_s")) is not None:
+                duration = _number(get(row, "duration_s")) / 60
+            yield _session(
+                get(row, "date"),
+                get(row, "activity"),
+                duration,
+                intensity=get(row, "intensity"),
+                calories=_number(get(row, "calories")),
+                distance_km=_number(get(row, "distance_km")),
+                source="csv"
+            )
+
+
+def _local(tag):
+    """Nombre de la etiqueta sin el espacio de nombres XML"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _stream(path):
+    """(evento, elemento, etiqueta, padre) de iterparse.
+
+    Con el padre a mano el llamador puede desenganchar cada elemento ya
+    procesado, de modo que el árbol no crece con el tamaño del fichero.
+    """
+    parents = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            yield event, elem, _local(elem.tag), parents[-1] if parents else None
+            parents.append(elem)
+        else:
+            parents.pop()
+            yield event, elem, _local(elem.tag), parents[-1] if parents else None
+
+
+def _release(elem, parent):
+    elem.clear()
+    if parent is not None:
+        parent.remove(elem)
+
+
+def _parse_time(text):
+    """Fecha ISO 8601 en hora local sin zona, como las que guarda la aplicación"""
+    when = datetime.fromisoformat(str(text).strip().replace("Z", "+00:00"))
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)
+    return when
+
+
+def normalize_date(value):
+    """Fecha ISO en hora local sin zona, o None si no se puede interpretar"""
+    try:
+        return _parse_time(value).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def iter_gpx(path):
+    """Una sesión por <trk>, recorriendo los puntos con iterparse.
+
+    Cada <trkpt> se libera en cuanto se procesa, así que la memoria no crece
+    con el número de puntos del track.
+    """
+    activity = None
+    first = last = previous = None
+    distance = 0.0
+
+    for event, elem, tag, parent in _stream(path):
+        if event == "start":
+            if tag == "trk":
+                activity, first, last, previous, distance = None, None, None, None, 0.0
+            continue
+
+        if tag == "type" and activity is None:
+            activity = elem.text
+        elif tag == "trkpt":
+            point = (_number(elem.get("lat")), _number(elem.get("lon")))
+            if None in point:
+                # Punto sin coordenadas válidas: no aporta distancia ni tiempo
+                _release(elem, parent)
+                continue
+            if previous is not None:
+                distance += _haversine_km(*previous, *point)
+            previous = point
+            for child in elem:
+                if _local(child.tag) == "time" and child.text:
+                    when = _parse_time(child.text)
+                    first = first or when
+                    last = when
+            _release(elem, parent)
+        elif tag == "trk":
+            if first is not None:
+                yield _session(
+                    first,
+                    activity or "running",
+                    (last - first).total_seconds() / 60,
+                    distance_km=distance,
+                    source="gpx"
+                )
+            _release(elem, parent)
+
+
+def iter_tcx(path):
+    """Una sesión por <Activity>, sumando tiempo, calorías y distancia de sus <Lap>"""
+    sport = start = None
+    seconds = calories = meters = 0.0
+
+    for event, elem, tag, parent in _stream(path):
+        if event == "start":
+            if tag == "Activity":
+                sport = elem.get("Sport")
+                start = None
+                seconds = calories = meters = 0.0
+            elif tag == "Lap" and start is None:
+                start = elem.get("StartTime")
+            continue
+
+        if tag == "Lap":
+            for child in elem:
+                name = _local(child.tag)
+                if name == "TotalTimeSeconds":
+                    seconds += _number(child.text) or 0
+                elif name == "Calories":
+                    calories += _number(child.text) or 0
+                elif name == "DistanceMeters":
+                    meters += _number(child.text) or 0
+            _release(elem, parent)
+        elif tag == "Trackpoint":
+            _release(elem, parent)
+        elif tag == "Activity":
+            if start:
+                yield _session(
+                    start,
+                    sport or "running",
+                    seconds / 60,
+                    calories=calories or None,
+                    distance_km=meters / 1000 if meters else None,
+                    source="tcx"
+                )
+            _release(elem, parent)
+
+
+PARSERS = {
+    ".csv": iter_csv,
+    ".gpx": iter_gpx,
+    ".tcx": iter_tcx
+}
+
+
+def iter_sessions(path):
+    """Sesiones de un fichero según su extensión"""
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix == ".fit":
+        # FIT es binario y necesitaría una dependencia adicional para decodificarlo
+        raise ImportFormatError("FIT no está soportado; exporta la actividad como TCX o GPX")
+    parser = PARSERS.get(suffix)
+    if parser is None:
+        raise ImportFormatError(f"formato no soportado ({suffix or 'sin extensión'})")
+    return parser(path)
+
+
+def iter_paths(paths):
+    """Ficheros a importar: los directorios se recorren en orden"""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in PARSERS:
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_sessions(paths, add_many, model=None, batch_size=1000):
+    """Importa las sesiones de `paths` en lotes de `batch_size`.
+
+    Los ficheros se leen de uno en uno y en streaming; solo un lote vive en
+    memoria. Las sesiones sin calorías (o sin actividad conocida por el
+    modelo) se estiman en bloque con `model` antes de escribir cada lote con
+    `add_many` (p. ej. DatabaseManager.add_progress_many).
+    """
+    stats = {"files": 0, "sessions": 0, "skipped": 0, "errors": []}
+
+    def sessions():
+        for path in iter_paths(paths):
+            try:
+                for record in iter_sessions(path):
+                    if record["date"] and record["duration"]:
+                        yield record
+                    else:
+                        stats["skipped"] += 1
+                # Solo cuentan los ficheros leídos hasta el final
+                stats["files"] += 1
+            except (OSError, ValueError, ET.ParseError) as e:
+                stats["errors"].append(f"{os.path.basename(str(path))}: {e}")
+
+    for batch in batched(sessions(), batch_size):
+        if model is not None:
+            _estimate_missing_calories(batch, model)
+        add_many(batch)
+        stats["sessions"] += len(batch)
+
+    return stats
+
+
+def _estimate_missing_calories(batch, model):
+    missing = [record for record in batch if record.get("calories") is None]
+    if not missing:
+        return
+    estimates = model.estimate_records(missing)
+    for record, calories in zip(missing, estimates.tolist()):
+        if calories == calories:  # NaN: actividad sin MET conocido
+            record["calories"] = calories
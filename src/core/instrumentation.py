@@ -0,0 +1,118 @@
+"""
+Instrumentación opcional: tiempos de renderizado, E/S de almacenamiento y gráficos
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("fitness.metrics")
+
+
+class Metrics:
+    """Registro de tiempos en memoria con las últimas muestras de cada métrica.
+
+    Desactivado no mide nada: `timed` se reduce a un `yield`. Activado guarda
+    hasta `samples` duraciones por nombre (y los campos extra de la última)
+    y escribe cada medición en el log. `enabled` activa todo el proceso;
+    `activate` solo el hilo actual (p. ej. la sesión de Streamlit con ?debug=1).
+    """
+
+    def __init__(self, enabled=False, samples=200):
+        self.enabled = enabled
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.series = {}
+        self.last_fields = {}
+        self.counts = {}
+        self._local = threading.local()
+
+    @property
+    def active(self):
+        """Si se mide en el hilo actual"""
+        return self.enabled or getattr(self._local, "enabled", False)
+
+    def activate(self, enabled=True):
+        """Activa o desactiva la medición solo para el hilo actual"""
+        self._local.enabled = enabled
+
+    def record(self, name, seconds, **fields):
+        with self.lock:
+            if name not in self.series:
+                self.series[name] = deque(maxlen=self.samples)
+                self.counts[name] = 0
+            self.series[name].append(seconds)
+            self.counts[name] += 1
+            self.last_fields[name] = fields
+
+        extra = " ".join(f"{key}={value}" for key, value in fields.items())
+        logger.info("%s %.1f ms %s", name, seconds * 1000, extra)
+
+    @contextmanager
+    def timed(self, name, **fields):
+        """Mide el bloque; el dict que devuelve admite campos extra (bytes, registros...)"""
+        if not self.active:
+            yield fields
+            return
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def summary(self):
+        """Una fila por métrica: llamadas, última, p50, p95 y máximo en ms"""
+        with self.lock:
+            snapshot = {name: list(values) for name, values in self.series.items()}
+            counts = dict(self.counts)
+            last_fields = dict(self.last_fields)
+
+        rows = []
+        for name in sorted(snapshot):
+            values = sorted(snapshot[name])
+            rows.append({
+                "metric": name,
+                "calls": counts[name],
+                "last_ms": snapshot[name][-1] * 1000,
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+                "max_ms": values[-1] * 1000,
+                "details": " ".join(f"{k}={v}" for k, v in last_fields[name].items())
+            })
+        return rows
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+            self.last_fields.clear()
+            self.counts.clear()
+
+
+metrics = Metrics()
+
+
+def configure(enabled, log_file=None, level="INFO", fmt=None, samples=200):
+    """Activa/desactiva la instrumentación del proceso y envía las mediciones a `log_file`.
+
+    El fichero se abre con la primera medición, así que se puede configurar
+    aunque solo vayan a medir algunas sesiones (ver Metrics.activate).
+    """
+    metrics.enabled = enabled
+    metrics.samples = samples
+    if log_file and not any(
+            isinstance(h, logging.FileHandler) and h.baseFilename == os.path.abspath(log_file)
+            for h in logger.handlers):
+        handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+        if fmt:
+            handler.setFormatter(logging.Formatter(fmt))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+    return metrics
+
+
+def storage_bytes(signature):
+    """Bytes en disco según la firma (mtime, tamaño) de un motor de almacenamiento"""
+    return sum(entry[1] for entry in signature if entry)
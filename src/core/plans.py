@@ -0,0 +1,201 @@
+"""
+Planes de entrenamiento semanales periodizados y generación por lotes
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .catalog import DEFAULT_CATALOG_FILE, LEVELS, load_catalog
+from .prescriptions import parse_prescription, scale_sets
+from .routines import estimate_minutes
+
+# Horas mínimas de recuperación por grupo muscular (tabla del README)
+RECOVERY_HOURS = {
+    "biceps": 48,
+    "triceps": 48,
+    "chest": 72,
+    "back": 48,
+    "shoulders": 72,
+    "legs": 72,
+    "abs": 24
+}
+
+# Mesociclo de 4 semanas: fase y factor de volumen sobre las series prescritas
+MESOCYCLE = [
+    ("Base", 1.0),
+    ("Carga", 1.15),
+    ("Intensificación", 1.3),
+    ("Descarga", 0.6)
+]
+
+# Días de entrenamiento (0 = lunes) según los días por semana
+TRAINING_DAYS = {
+    2: [0, 3],
+    3: [0, 2, 4],
+    4: [0, 1, 3, 4],
+    5: [0, 1, 2, 3, 4],
+    6: [0, 1, 2, 3, 4, 5]
+}
+
+# Con menos días se trabajan más grupos por sesión
+GROUPS_PER_SESSION = {2: 4, 3: 3, 4: 2, 5: 2, 6: 2}
+
+WEEKDAYS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+class PlanGenerator:
+    """Programa de varias semanas que respeta la recuperación de cada músculo.
+
+    Cada día de entrenamiento elige, entre los grupos ya recuperados, los que
+    llevan más tiempo sin trabajarse; si ninguno lo está (o ninguno cabe en
+    los minutos de la sesión), la sesión pasa a ser de flexibilidad. El
+    volumen de cada semana sigue la fase del mesociclo.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def generate(self, level="principiante", days_per_week=3, weeks=4, duration=45, seed=None, user_id=None):
+        if days_per_week not in TRAINING_DAYS:
+            raise ValueError(f"Días por semana no soportados: {days_per_week}")
+
+        rng = random.Random(seed)
+        pools = self._exercise_pools(level, rng)
+        last_trained = {}
+        sessions = []
+
+        for week in range(weeks):
+            phase, factor = MESOCYCLE[week % len(MESOCYCLE)]
+            for day in TRAINING_DAYS[days_per_week]:
+                hour = (week * 7 + day) * 24
+                focus = self._pick_groups(hour, last_trained, GROUPS_PER_SESSION[days_per_week])
+                exercises = self._strength_block(focus, pools, week, duration, factor) if focus else []
+                # Los grupos que no cupieron en el tiempo no se entrenan y siguen recuperados
+                focus = [group for group in focus if any(e["muscle_group"] == group for e in exercises)]
+
+                if focus:
+                    for group in focus:
+                        last_trained[group] = hour
+                    workout_type = "fuerza"
+                else:
+                    exercises = self._flexibility_block(level, rng, duration)
+                    workout_type = "flexibilidad"
+
+                sessions.append({
+                    "week": week + 1,
+                    "day": day,
+                    "weekday": WEEKDAYS[day],
+                    "phase": phase,
+                    "volume_factor": factor,
+                    "type": workout_type,
+                    "focus": focus,
+                    "exercises": exercises,
+                    "minutes": round(sum(e["minutes"] for e in exercises), 1)
+                })
+
+        return {
+            "user_id": user_id,
+            "level": level,
+            "days_per_week": days_per_week,
+            "weeks": weeks,
+            "duration": duration,
+            "seed": seed,
+            "sessions": sessions
+        }
+
+    def _exercise_pools(self, level, rng):
+        """Ejercicios por grupo hasta el nivel pedido, en un orden fijado por la semilla"""
+        allowed = set(LEVELS[:LEVELS.index(level) + 1])
+        pools = {}
+        for group in RECOVERY_HOURS:
+            pool = [e for e in self.catalog.muscle_exercises(group) if e["level"] in allowed]
+            rng.shuffle(pool)
+            pools[group] = pool
+        return pools
+
+    @staticmethod
+    def _pick_groups(hour, last_trained, count):
+        recovered = [
+            group for group, hours in RECOVERY_HOURS.items()
+            if hour - last_trained.get(group, -hours) >= hours
+        ]
+        # Primero los que llevan más tiempo sin entrenarse
+        recovered.sort(key=lambda group: last_trained.get(group, -1e9))
+        return recovered[:count]
+
+    @staticmethod
+    def _strength_block(focus, pools, week, duration, factor):
+        """Rota los ejercicios de cada grupo por semana hasta llenar su parte del tiempo.
+
+        El tiempo se cuenta sobre la prescripción ya escalada por la fase. En
+        la descarga también se recorta el presupuesto: si no, el hueco de las
+        series quitadas se llenaría con más ejercicios y el volumen no bajaría.
+
+        Cada grupo tiene al menos un ejercicio aunque pase de su parte, siempre
+        que la sesión siga dentro del total; si ni eso cabe, el grupo se omite.
+        """
+        total = duration * min(factor, 1.0)
+        budget = total / len(focus)
+        block = []
+        session = 0.0
+        for group in focus:
+            pool = pools[group]
+            spent = 0.0
+            for offset in range(len(pool)):
+                exercise = pool[(week + offset) % len(pool)]
+                sets = scale_sets(exercise["prescription"], factor)
+                minutes = parse_prescription(sets).minutes("fuerza")[1]
+                if session + minutes > total or (spent and spent + minutes > budget):
+                    break
+                spent += minutes
+                session += minutes
+                block.append({
+                    "exercise": exercise["name"],
+                    "muscle_group": group,
+                    "sets": sets,
+                    "description": exercise["muscles"],
+                    "minutes": round(minutes, 1)
+                })
+        return block
+
+    def _flexibility_block(self, level, rng, duration):
+        pool = list(self.catalog.routine_exercises("flexibilidad", level))
+        rng.shuffle(pool)
+        block = []
+        spent = 0.0
+        for exercise in pool:
+            minutes = estimate_minutes(exercise, "flexibilidad")[1]
+            if spent and spent + minutes > duration:
+                break
+            spent += minutes
+            block.append({
+                "exercise": exercise["name"],
+                "muscle_group": None,
+                "sets": exercise["prescription"],
+                "description": exercise["description"],
+                "minutes": round(minutes, 1)
+            })
+        return block
+
+
+def _plan_worker(args):
+    catalog_file, request = args
+    # Cada proceso carga el catálogo una vez gracias a load_catalog
+    return PlanGenerator(load_catalog(catalog_file)).generate(**request)
+
+
+def generate_plans(requests, catalog_file=DEFAULT_CATALOG_FILE, workers=None, chunksize=64):
+    """Genera un plan por petición (kwargs de PlanGenerator.generate).
+
+    Con `workers` > 1 el trabajo se reparte en un pool de procesos; el orden
+    de los resultados coincide con el de las peticiones.
+    """
+    tasks = [(catalog_file, request) for request in requests]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) <= chunksize:
+        return [_plan_worker(task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_plan_worker, tasks, chunksize=chunksize))
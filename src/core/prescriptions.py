@@ -0,0 +1,121 @@
+"""
+Prescripciones de ejercicio ("3x8-12", "20-30 min", "30s c/lado"...) como registros tipados
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Segundos por repetición, descanso entre series y transición entre ejercicios
+SECONDS_PER_REP = 3
+REST_SECONDS = {"fuerza": 60, "cardio": 30, "flexibilidad": 15}
+TRANSITION_MINUTES = 1
+
+SETS_RE = re.compile(r"^(\d+)\s*x\s*(\d+)(?:\s*-\s*(\d+))?\s*(s|min)?", re.IGNORECASE)
+RANGE_RE = re.compile(r"^(\d+)(?:\s*-\s*(\d+))?\s*(s|min)?", re.IGNORECASE)
+PER_SIDE_RE = re.compile(r"c/(lado|pierna|brazo|pie|direcci)|adelante/atr", re.IGNORECASE)
+
+
+class Prescription(namedtuple("Prescription", [
+        "sets", "reps_low", "reps_high", "hold_low", "hold_high",
+        "minutes_low", "minutes_high", "per_side"])):
+    """Prescripción compilada.
+
+    Solo una de las tres magnitudes viene informada: repeticiones por serie,
+    segundos de mantenimiento por serie o minutos de un bloque continuo. Las
+    prescripciones libres ("Ver descripción") quedan con todo a cero.
+    """
+
+    __slots__ = ()
+
+    @property
+    def sides(self):
+        return 2 if self.per_side else 1
+
+    @property
+    def is_free(self):
+        return not (self.reps_high or self.hold_high or self.minutes_high)
+
+    def volume(self):
+        """(series, repeticiones típicas) contando ambos lados"""
+        if self.minutes_high or self.is_free:
+            return 0, 0.0
+        reps = self.sets * self.sides * (self.reps_low + self.reps_high) / 2
+        return self.sets, reps
+
+    def minutes(self, workout_type="fuerza"):
+        """(mínimo, típico) de minutos que ocupa en la sesión"""
+        if self.minutes_high:
+            return (float(self.sides * self.minutes_low),
+                    self.sides * (self.minutes_low + self.minutes_high) / 2)
+        if self.is_free:
+            # Prescripción libre: se asume un bloque estándar
+            return 5.0, 5.0
+
+        rest = (self.sets - 1) * REST_SECONDS.get(workout_type, 60)
+        if self.hold_high:
+            per_set = (self.hold_low, (self.hold_low + self.hold_high) / 2)
+        else:
+            per_set = (self.reps_low * SECONDS_PER_REP,
+                       (self.reps_low + self.reps_high) / 2 * SECONDS_PER_REP)
+        return tuple(
+            (self.sets * self.sides * seconds + rest) / 60 + TRANSITION_MINUTES
+            for seconds in per_set
+        )
+
+
+FREE = Prescription(0, 0, 0, 0, 0, 0, 0, False)
+
+
+@lru_cache(maxsize=4096)
+def parse_prescription(text):
+    """Compila el texto de una prescripción; el resultado se cachea por texto"""
+    text = str(text or "").strip()
+    per_side = bool(PER_SIDE_RE.search(text))
+
+    match = SETS_RE.match(text)
+    if match:
+        sets = int(match.group(1))
+        rest = match.group(2), match.group(3), match.group(4)
+    else:
+        match = RANGE_RE.match(text)
+        if not match:
+            return FREE
+        sets = 1
+        rest = match.group(1), match.group(2), match.group(3)
+
+    low = int(rest[0])
+    high = int(rest[1] or low)
+    unit = (rest[2] or "").lower()
+
+    if unit == "min" and sets == 1:
+        return Prescription(1, 0, 0, 0, 0, low, high, per_side)
+    if unit:
+        factor = 60 if unit == "min" else 1
+        return Prescription(sets, 0, 0, low * factor, high * factor, 0, 0, per_side)
+    return Prescription(sets, low, high, 0, 0, 0, 0, per_side)
+
+
+def routine_volume(items, workout_type="fuerza"):
+    """Series, repeticiones y minutos de una lista de ejercicios.
+
+    Acepta ejercicios del catálogo (con "parsed") o ejercicios de una rutina
+    guardada, cuya prescripción está en "sets".
+    """
+    totals = {"sets": 0, "reps": 0.0, "minutes": 0.0}
+    for item in items or []:
+        parsed = item.get("parsed") or parse_prescription(item.get("prescription", item.get("sets")))
+        sets, reps = parsed.volume()
+        totals["sets"] += sets
+        totals["reps"] += reps
+        totals["minutes"] += parsed.minutes(workout_type)[1]
+    return totals
+
+
+def scale_sets(text, factor):
+    """Misma prescripción con las series multiplicadas por `factor` (mínimo 1)"""
+    parsed = parse_prescription(text)
+    if factor == 1 or parsed.minutes_high or parsed.is_free or not SETS_RE.match(str(text)):
+        return text
+    sets = max(1, round(parsed.sets * factor))
+    return re.sub(r"^\s*\d+", str(sets), str(text), count=1)
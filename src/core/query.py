@@ -0,0 +1,156 @@
+"""
+Consultas por rango de fechas con índice ordenado y paginación por cursor
+"""
+
+import base64
+import heapq
+import json
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+# Mayor que cualquier carácter de una fecha ISO: "2024-01-31" + MAX_SUFFIX
+# queda por encima de todas las horas de ese día
+MAX_SUFFIX = "\uffff"
+
+
+def date_key(value):
+    """Texto ISO comparable para una fecha, un datetime o una cadena"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value or "")
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        day, position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(day), int(position)
+    except (ValueError, TypeError):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+
+
+def decode_sort_cursor(cursor):
+    """Clave (sin valor, valor, posición) de un cursor de query_page con `order_by`"""
+    try:
+        missing, value, position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return bool(missing), value, int(position)
+    except (ValueError, TypeError):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+
+
+class DateIndex:
+    """Claves (fecha ISO, posición) ordenadas para una colección.
+
+    Un rango de fechas son dos búsquedas binarias y un recorrido de los k
+    resultados: O(log n + k). Las altas suelen llegar en orden y se añaden al
+    final; las que no, se insertan en su sitio.
+    """
+
+    def __init__(self, records=()):
+        self.keys = sorted((date_key(r.get("date")), i) for i, r in enumerate(records))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, record, position):
+        key = (date_key(record.get("date")), position)
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+        else:
+            insort(self.keys, key)
+
+    def bounds(self, start=None, end=None):
+        """Índices [lo, hi) de las claves con start <= fecha <= end (fin inclusivo)"""
+        lo = 0 if start is None else bisect_left(self.keys, (date_key(start),))
+        if end is None:
+            hi = len(self.keys)
+        elif isinstance(end, datetime):
+            hi = bisect_right(self.keys, (date_key(end), float("inf")))
+        elif isinstance(end, date):
+            hi = bisect_left(self.keys, ((end + timedelta(days=1)).isoformat(),))
+        else:
+            hi = bisect_left(self.keys, (date_key(end) + MAX_SUFFIX,))
+        return lo, max(lo, hi)
+
+    def count(self, start=None, end=None):
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def count_after(self, since):
+        """Claves con fecha estrictamente posterior a `since`"""
+        return len(self.keys) - bisect_right(self.keys, (date_key(since), float("inf")))
+
+    def scan(self, start=None, end=None, descending=False, after=None):
+        """Claves del rango, de forma perezosa; `after` reanuda tras esa clave"""
+        lo, hi = self.bounds(start, end)
+        if after is not None:
+            if descending:
+                hi = min(hi, bisect_left(self.keys, after))
+            else:
+                lo = max(lo, bisect_right(self.keys, after))
+        indices = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        keys = self.keys
+        return (keys[i] for i in indices)
+
+
+def _matcher(filters):
+    """Función registro -> bool para filtros por igualdad o pertenencia"""
+    checks = []
+    for field, expected in filters.items():
+        if expected is None:
+            continue
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            allowed = set(expected)
+            checks.append(lambda r, f=field, a=allowed: r.get(f) in a)
+        else:
+            checks.append(lambda r, f=field, e=expected: r.get(f) == e)
+    return lambda record: all(check(record) for check in checks)
+
+
+def iter_query(records, index, start=None, end=None, descending=False, after=None, **filters):
+    """(clave, registro) que cumplen rango y filtros, sin materializar la lista"""
+    matches = _matcher(filters)
+    for key in index.scan(start, end, descending=descending, after=after):
+        record = records[key[1]]
+        if matches(record):
+            yield key, record
+
+
+def query_page(records, index, limit=50, cursor=None, start=None, end=None, descending=True,
+               order_by="date", **filters):
+    """Una página de resultados y el cursor de la siguiente (None si no hay más).
+
+    Por fecha se recorre el índice y cada página es O(log n + limit). Con otro
+    campo en `order_by` se ordena por (valor, posición), dejando al final los
+    registros sin valor, y cada página selecciona las `limit` primeras
+    posteriores al cursor entre los k registros del rango: O(k log limit).
+    """
+    if order_by != "date":
+        return _sorted_page(records, index, order_by, limit, cursor, start, end, descending, filters)
+
+    after = decode_cursor(cursor) if cursor else None
+    results = iter_query(records, index, start, end, descending=descending, after=after, **filters)
+    page = list(islice(results, limit + 1))
+    next_cursor = encode_cursor(page[limit - 1][0]) if len(page) > limit else None
+    return [record for _, record in page[:limit]], next_cursor
+
+
+def _sorted_page(records, index, order_by, limit, cursor, start, end, descending, filters):
+    after = decode_sort_cursor(cursor) if cursor else None
+
+    def sort_key(key, record):
+        value = record.get(order_by)
+        # Los registros sin valor van al final en los dos sentidos
+        return (value is None) != descending, 0 if value is None else value, key[1]
+
+    candidates = ((sort_key(key, record), record) for key, record in iter_query(records, index, start, end, **filters))
+    if after is not None:
+        candidates = (c for c in candidates if (c[0] < after if descending else c[0] > after))
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, candidates, key=lambda c: c[0])
+    next_cursor = encode_cursor(page[limit - 1][0]) if len(page) > limit else None
+    return [record for _, record in page[:limit]], next_cursor
@@ -0,0 +1,88 @@
+"""
+Motor de rutinas: ajusta ejercicios al tiempo disponible de forma reproducible
+"""
+
+import random
+from functools import lru_cache
+
+from .prescriptions import parse_prescription
+
+
+def estimate_minutes(exercise, workout_type="fuerza"):
+    """(mínimo, típico) de minutos que ocupa un ejercicio según su prescripción"""
+    parsed = exercise.get("parsed") or parse_prescription(exercise.get("prescription"))
+    return parsed.minutes(workout_type)
+
+
+class RoutineEngine:
+    """Selección voraz tipo mochila sobre el presupuesto de minutos.
+
+    En cada paso elige el ejercicio con mayor valor por minuto, donde el valor
+    premia los músculos aún no trabajados en la rutina. La semilla solo fija el
+    orden de desempate, así que la misma petición devuelve la misma rutina.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def generate(self, workout_type, level, duration, seed=None):
+        if seed is None:
+            return self._generate(workout_type, level, duration, None)
+        # Memoizado por (catálogo, tipo, nivel, duración, semilla)
+        return [dict(item) for item in _generate_cached(self.catalog, workout_type, level, duration, seed)]
+
+    def _generate(self, workout_type, level, duration, seed):
+        exercises = list(self.catalog.routine_exercises(workout_type, level))
+        if not exercises:
+            exercises = [{"name": "Ejercicio básico", "prescription": "3x10",
+                          "description": "Movimiento general", "muscle_tags": []}]
+
+        rng = random.Random(seed)
+        rng.shuffle(exercises)
+
+        candidates = [(exercise, estimate_minutes(exercise, workout_type)) for exercise in exercises]
+        remaining = float(duration)
+        covered = set()
+        routine = []
+
+        while candidates:
+            best = None
+            for index, (exercise, (low, typical)) in enumerate(candidates):
+                if low > remaining:
+                    continue
+                minutes = min(typical, remaining)
+                gain = len(set(exercise.get("muscle_tags", [])) - covered)
+                value = (1 + gain) / max(minutes, 0.5)
+                if best is None or value > best[0]:
+                    best = (value, index, minutes)
+
+            if best is None:
+                break
+
+            _, index, minutes = best
+            exercise, _ = candidates.pop(index)
+            covered.update(exercise.get("muscle_tags", []))
+            remaining -= minutes
+            routine.append({
+                "exercise": exercise["name"],
+                "sets": exercise["prescription"],
+                "description": exercise["description"],
+                "minutes": round(minutes, 1)
+            })
+
+        # Si ni siquiera cabe un ejercicio, se propone el más corto
+        if not routine:
+            exercise, (low, _) = min(candidates, key=lambda c: c[1][0])
+            routine.append({
+                "exercise": exercise["name"],
+                "sets": exercise["prescription"],
+                "description": exercise["description"],
+                "minutes": round(low, 1)
+            })
+
+        return routine
+
+
+@lru_cache(maxsize=1024)
+def _generate_cached(catalog, workout_type, level, duration, seed):
+    return tuple(RoutineEngine(catalog)._generate(workout_type, level, duration, seed))
@@ -0,0 +1,128 @@
+"""
+Búsqueda de texto completo sobre el catálogo de ejercicios
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "o", "para", "por", "sin", "su", "un", "una", "y"
+}
+
+# Peso de cada campo en la puntuación (BM25F simplificado)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "muscles": 2.0,
+    "description": 1.0,
+    "tips": 0.5
+}
+
+# Los términos que solo coinciden por prefijo puntúan algo menos que los exactos
+PREFIX_PENALTY = 0.8
+
+
+def fold(text):
+    """Minúsculas y sin acentos: "Bíceps" y "biceps" se indexan igual"""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(fold(text)) if t not in STOP_WORDS]
+
+
+class SearchIndex:
+    """Índice invertido con ranking BM25 y coincidencia por prefijo.
+
+    Se construye una vez; cada consulta solo toca las listas de postings de
+    sus términos. El vocabulario ordenado permite expandir prefijos con
+    búsqueda binaria.
+    """
+
+    def __init__(self, documents, fields=FIELD_WEIGHTS, k1=1.2, b=0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+
+        tokenized = [self._tokenize_fields(doc, fields) for doc in self.documents]
+        n = max(len(self.documents), 1)
+        avg_length = {
+            field: (sum(len(tokens[field]) for tokens in tokenized) / n) or 1
+            for field in fields
+        }
+
+        # Frecuencia ponderada y normalizada por longitud de cada término/documento
+        self.postings = {}
+        for doc_id, tokens in enumerate(tokenized):
+            weighted = {}
+            for field, weight in fields.items():
+                norm = 1 - b + b * len(tokens[field]) / avg_length[field]
+                for term in tokens[field]:
+                    weighted[term] = weighted.get(term, 0.0) + weight / norm
+            for term, tf in weighted.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+
+    @staticmethod
+    def _tokenize_fields(doc, fields):
+        tokens = {}
+        seen = set()
+        for field in fields:
+            text = doc.get(field) or ""
+            # Un mismo texto en dos campos (p. ej. músculos = descripción) no puntúa doble
+            tokens[field] = tokenize(text) if text not in seen else []
+            seen.add(text)
+        return tokens
+
+    def expand(self, token):
+        """Términos del vocabulario que empiezan por `token`"""
+        terms = []
+        i = bisect_left(self.vocabulary, token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+            terms.append(self.vocabulary[i])
+            i += 1
+        return terms
+
+    def _token_scores(self, token):
+        scores = {}
+        for term in self.expand(token):
+            factor = 1.0 if term == token else PREFIX_PENALTY
+            idf = self.idf[term]
+            for doc_id, tf in self.postings[term].items():
+                score = factor * idf * tf * (self.k1 + 1) / (tf + self.k1)
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query, limit=10):
+        """Documentos que contienen todos los términos de `query`, por relevancia"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        totals = None
+        for token in tokens:
+            scores = self._token_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {
+                    doc_id: totals[doc_id] + score
+                    for doc_id, score in scores.items()
+                    if doc_id in totals
+                }
+            if not totals:
+                return []
+
+        best = heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+        return [(self.documents[doc_id], score) for doc_id, score in best]
@@ -0,0 +1,97 @@
+"""
+Particionado de datos por usuario: un shard (directorio propio) por usuario
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import unicodedata
+from datetime import datetime
+
+from .fileio import FileLock, atomic_write_json
+
+DEFAULT_USER = "default"
+DATA_FILE_NAME = "fitness_data.json"
+
+
+def normalize_user_id(raw_user_id):
+    """Convierte un nombre de usuario libre en un id seguro para rutas"""
+    text = unicodedata.normalize("NFKD", str(raw_user_id or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    user_id = re.sub(r"[^a-z0-9_-]+", "-", text.strip().lower()).strip("-")
+    return user_id[:64] or DEFAULT_USER
+
+
+class ShardIndex:
+    """Índice de shards bajo `root`.
+
+    Cada usuario vive en `root/<prefijo>/<user_id>/fitness_data.json`; el
+    prefijo (2 caracteres del hash del id) evita directorios con miles de
+    entradas. `index.json` registra los usuarios conocidos y la ruta de su
+    shard, y solo se reescribe al dar de alta un usuario nuevo.
+    """
+
+    def __init__(self, root, legacy_file=None):
+        self.root = str(root)
+        self.index_file = os.path.join(self.root, "index.json")
+        self.legacy_file = str(legacy_file) if legacy_file else None
+        os.makedirs(self.root, exist_ok=True)
+        # Entre hilos y entre procesos (p. ej. api.py --workers N)
+        self._lock = FileLock(self.index_file)
+        self.entries = self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        with open(self.index_file, 'r') as f:
+            return json.load(f)
+
+    def _write_index(self):
+        atomic_write_json(self.index_file, self.entries)
+
+    @staticmethod
+    def shard_dir_name(user_id):
+        prefix = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(prefix, user_id)
+
+    def users(self):
+        return sorted(self.entries)
+
+    def data_file(self, user_id):
+        """Ruta del fichero de datos del usuario, creando su shard si no existe"""
+        user_id = normalize_user_id(user_id)
+        entry = self.entries.get(user_id)
+        if entry is None:
+            with self._lock:
+                # Otro proceso pudo registrar usuarios desde que leímos el índice
+                self.entries = self._read_index()
+                entry = self.entries.get(user_id)
+                if entry is None:
+                    entry = self._register(user_id)
+        return os.path.join(self.root, entry["path"], DATA_FILE_NAME)
+
+    def _register(self, user_id):
+        shard_dir = self.shard_dir_name(user_id)
+        os.makedirs(os.path.join(self.root, shard_dir), exist_ok=True)
+
+        if user_id == DEFAULT_USER:
+            self._migrate_legacy(os.path.join(self.root, shard_dir))
+
+        entry = {"path": shard_dir, "created": datetime.now().isoformat()}
+        self.entries[user_id] = entry
+        self._write_index()
+        return entry
+
+    def _migrate_legacy(self, shard_path):
+        """El usuario por defecto hereda el fitness_data.json de un solo usuario"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        target = os.path.join(shard_path, DATA_FILE_NAME)
+        if os.path.exists(target):
+            return
+        shutil.copy2(self.legacy_file, target)
+        legacy_journal = os.path.splitext(self.legacy_file)[0] + ".journal.jsonl"
+        if os.path.exists(legacy_journal):
+            shutil.copy2(legacy_journal, os.path.splitext(target)[0] + ".journal.jsonl")
@@ -0,0 +1,214 @@
+"""
+Motor de almacenamiento SQLite: documento del usuario en tablas, escrituras transaccionales
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .fileio import FileLock
+from .storage import JournalStorage, empty_document, file_signature
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    type TEXT,
+    level TEXT,
+    duration REAL,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    activity TEXT,
+    intensity TEXT,
+    duration REAL,
+    calories REAL,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- Índices de versiones anteriores: ninguna consulta los usa y encarecen cada alta
+DROP INDEX IF EXISTS idx_workouts_date;
+DROP INDEX IF EXISTS idx_workouts_type_date;
+DROP INDEX IF EXISTS idx_progress_date;
+DROP INDEX IF EXISTS idx_progress_activity_date;
+"""
+
+DEFAULT_PROFILE = "default"
+
+
+def _workout_row(record):
+    return (
+        record.get("date") or "",
+        record.get("type"),
+        record.get("level"),
+        record.get("duration"),
+        json.dumps(record, default=str)
+    )
+
+
+def _progress_row(record):
+    return (
+        record.get("date") or "",
+        record.get("activity"),
+        record.get("intensity"),
+        record.get("duration"),
+        record.get("calories"),
+        json.dumps(record, default=str)
+    )
+
+
+@contextmanager
+def _as_value_error():
+    # Un registro que viola el esquema es un dato inválido para quien llama
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        raise ValueError(f"Registro no válido para SQLite: {e}")
+
+
+INSERTS = {
+    "workouts": (
+        "INSERT INTO workouts (date, type, level, duration, payload) VALUES (?, ?, ?, ?, ?)",
+        _workout_row
+    ),
+    "progress": (
+        "INSERT INTO progress (date, activity, intensity, duration, calories, payload) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        _progress_row
+    )
+}
+
+
+class SQLiteStorage:
+    """Workouts, sesiones de progreso y perfiles en tablas.
+
+    Usa journal WAL para que varios lectores (sesiones de Streamlit) no se
+    bloqueen mientras otra sesión escribe. Cada hilo abre su propia conexión.
+
+    Como los demás motores, solo persiste: DatabaseManager carga el documento
+    completo y resuelve rangos, conteos y totales en memoria (DateIndex y
+    AggregateCache). Las altas son INSERT de las filas nuevas; solo save()
+    (p. ej. tras recalcular calorías) reescribe las tablas.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._local = threading.local()
+        self.file_lock = FileLock(db_file)
+        # SQLite se recupera con su propio journal; nunca se restaura una copia
+        self.recovery = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_json_file(cls, json_file):
+        """Base SQLite junto a `json_file`, importándolo la primera vez"""
+        storage = cls(os.path.splitext(json_file)[0] + ".db")
+        storage.import_json(json_file)
+        return storage
+
+    def locked(self):
+        # Las transacciones de SQLite no bastan: DatabaseManager recarga, inserta
+        # y guarda la firma como un solo paso, y ningún otro proceso debe
+        # escribir entre medias o su alta quedaría dentro de la firma sin leerse
+        return self.file_lock
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def import_json(self, json_file):
+        """Importa una única vez el `fitness_data.json` existente (y su journal).
+
+        Devuelve False si la base ya se había importado anteriormente.
+        """
+        conn = self._connect()
+        with self.file_lock:
+            imported = conn.execute(
+                "SELECT value FROM meta WHERE key = 'imported_from'"
+            ).fetchone()
+            if imported:
+                return False
+
+            data = JournalStorage(json_file).load()
+            with conn:
+                self._insert_document(conn, data)
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('imported_from', ?)",
+                    (os.path.abspath(json_file),)
+                )
+            return True
+
+    def _insert_document(self, conn, data):
+        for collection, (sql, to_row) in INSERTS.items():
+            conn.executemany(sql, [to_row(r) for r in data.get(collection, [])])
+        conn.execute(
+            "INSERT OR REPLACE INTO profiles (user_id, payload) VALUES (?, ?)",
+            (DEFAULT_PROFILE, json.dumps(data.get("user_profile", {}), default=str))
+        )
+
+    def load(self):
+        conn = self._connect()
+        data = empty_document()
+        for collection in INSERTS:
+            rows = conn.execute(f"SELECT payload FROM {collection} ORDER BY id")
+            data[collection] = [json.loads(payload) for (payload,) in rows]
+
+        profile = conn.execute(
+            "SELECT payload FROM profiles WHERE user_id = ?", (DEFAULT_PROFILE,)
+        ).fetchone()
+        if profile:
+            data["user_profile"] = json.loads(profile[0])
+
+        # Agregados del último save(); DatabaseManager añade los registros posteriores
+        aggregates = conn.execute("SELECT value FROM meta WHERE key = 'aggregates'").fetchone()
+        if aggregates:
+            data["aggregates"] = json.loads(aggregates[0])
+        return data
+
+    def save(self, data):
+        conn = self._connect()
+        with _as_value_error(), conn:
+            conn.execute("DELETE FROM workouts")
+            conn.execute("DELETE FROM progress")
+            self._insert_document(conn, data)
+            if "aggregates" in data:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregates', ?)",
+                    (json.dumps(data["aggregates"]),)
+                )
+
+    def append_many(self, collection, records, data):
+        """Inserta un lote en una sola transacción"""
+        sql, to_row = INSERTS[collection]
+        conn = self._connect()
+        with _as_value_error(), conn:
+            conn.executemany(sql, [to_row(r) for r in records])
+
+    def signature(self):
+        # Con WAL los commits modifican primero el fichero -wal
+        return file_signature(self.db_file, self.db_file + "-wal")
+
+    def tail(self, signature):
+        # Sin número de secuencia por fila no se sabe qué es nuevo: recarga completa
+        return None
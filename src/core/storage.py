@@ -0,0 +1,270 @@
+"""
+Motores de almacenamiento para DatabaseManager
+"""
+
+import json
+import logging
+import os
+
+from .fileio import BackupPolicy, FileLock, append_lines, atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+
+def empty_document():
+    """Documento vacío con la estructura que espera DatabaseManager"""
+    return {
+        "workouts": [],
+        "progress": [],
+        "user_profile": {}
+    }
+
+
+def file_signature(*paths):
+    """(mtime, tamaño) de cada fichero; cambia cuando otro proceso escribe"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def with_records(data, collection, records):
+    """Copia superficial de `data` con `records` añadidos al final de `collection`"""
+    document = dict(data)
+    document[collection] = data[collection] + records
+    return document
+
+
+class JsonStorage:
+    """Formato original: un único documento JSON que se reescribe completo"""
+
+    def __init__(self, data_file, backup_policy=None):
+        self.data_file = data_file
+        self.backup_policy = backup_policy or BackupPolicy(data_file, enabled=False)
+        self.file_lock = FileLock(data_file)
+        # Qué se recuperó en el último load() tras encontrar el fichero corrupto
+        self.recovery = None
+
+    def locked(self):
+        return self.file_lock
+
+    def load(self):
+        self.recovery = None
+        if not os.path.exists(self.data_file):
+            return empty_document()
+        data, restored = read_json(self.data_file, self.backup_policy)
+        if restored:
+            self.recovery = (f"{self.data_file} estaba corrupto; restaurado desde {restored} "
+                             f"(se pierden los cambios posteriores a esa copia)")
+        self.backup_policy.maybe_backup()
+        return data
+
+    def save(self, data):
+        atomic_write_json(self.data_file, data)
+        self.backup_policy.maybe_backup()
+
+    def signature(self):
+        return file_signature(self.data_file)
+
+    def tail(self, signature):
+        # Cada escritura reescribe el documento: no hay cola que leer
+        return None
+
+    def append_many(self, collection, records, data):
+        # Un lote completo cuesta una sola reescritura; `data` aún no lo incluye
+        self.save(with_records(data, collection, records))
+
+
+class JournalStorage:
+    """Snapshot JSON + journal JSON Lines de solo-anexado.
+
+    Cada alta añade una línea al journal (O(1) respecto al historial). El
+    journal se compacta en un nuevo snapshot cuando acumula al menos
+    `compact_every` registros y ocupa `compact_ratio` veces el snapshot: así
+    cada reescritura completa se amortiza sobre un volumen de altas
+    proporcional al historial. El snapshot guarda el último número de
+    secuencia aplicado, así que las líneas ya incluidas se ignoran si el
+    journal no llegó a vaciarse.
+    """
+
+    def __init__(self, data_file, compact_every=500, compact_ratio=0.5, backup_policy=None):
+        self.snapshot_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + ".journal.jsonl"
+        self.compact_every = compact_every
+        self.compact_ratio = compact_ratio
+        self.backup_policy = backup_policy or BackupPolicy(data_file, enabled=False)
+        self.file_lock = FileLock(data_file)
+        self.seq = 0
+        self.pending = 0
+        # Bytes del journal ya leídos o escritos por este proceso (ver tail)
+        self.offset = 0
+        # Qué se recuperó en el último load() tras encontrar el snapshot corrupto
+        self.recovery = None
+
+    def locked(self):
+        return self.file_lock
+
+    def load(self):
+        """Snapshot más las líneas del journal posteriores a su secuencia.
+
+        Si el snapshot está corrupto se parte de la última copia válida o, sin
+        copias, de un documento vacío; en ambos casos el journal se reproduce
+        encima para no perder las altas posteriores a la última compactación.
+        """
+        data = empty_document()
+        self.recovery = None
+        if os.path.exists(self.snapshot_file):
+            try:
+                snapshot, restored = read_json(self.snapshot_file, self.backup_policy)
+            except ValueError as e:
+                snapshot = {}
+                self.recovery = (f"{self.snapshot_file} estaba corrupto y no hay copia válida ({e}); "
+                                 f"solo se recuperan las altas del journal")
+            else:
+                if restored:
+                    self.recovery = (f"{self.snapshot_file} estaba corrupto; restaurado desde {restored} "
+                                     f"más el journal (se pierden las altas entre esa copia y la última compactación)")
+                self.backup_policy.maybe_backup()
+            data.update(snapshot)
+
+        self.seq = data.pop("_seq", 0)
+        self.pending = 0
+        self.offset = 0
+
+        if os.path.exists(self.journal_file):
+            self._replay(data)
+
+        return data
+
+    def _replay(self, data):
+        valid_end = 0
+        offset = 0
+        with open(self.journal_file, 'rb') as f:
+            for raw in f:
+                offset += len(raw)
+                if not raw.strip():
+                    valid_end = offset
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    logger.warning("Línea ilegible en %s (byte %d)", self.journal_file, offset - len(raw))
+                    continue
+                valid_end = offset
+                if entry["seq"] <= self.seq:
+                    continue
+                self._apply(data, entry)
+                self.seq = entry["seq"]
+                self.pending += 1
+
+        # Una escritura interrumpida deja una última línea sin terminar; se
+        # recorta para que el siguiente registro no se concatene a ella
+        if valid_end < offset:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_end)
+        self.offset = valid_end
+
+    def tail(self, signature):
+        """Registros que otros procesos añadieron al journal desde `signature`.
+
+        Devuelve (colección, registro) en orden, o None si el snapshot cambió
+        (otro proceso compactó) y hay que recargar el documento completo. Solo
+        se leen los bytes nuevos, así que el coste no depende del historial.
+        """
+        current = self.signature()
+        if current[0] != signature[0] or current[1] is None or current[1][1] < self.offset:
+            return None
+
+        entries = []
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # línea a medio escribir: se leerá entera la próxima vez
+                self.offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    logger.warning("Línea ilegible en %s (byte %d)", self.journal_file, self.offset - len(raw))
+                    continue
+                if entry["seq"] <= self.seq:
+                    continue
+                entries.append((entry["collection"], entry["record"]))
+                self.seq = entry["seq"]
+                self.pending += 1
+        return entries
+
+    def save(self, data):
+        """Compacta el journal en un nuevo snapshot"""
+        snapshot = dict(data)
+        snapshot["_seq"] = self.seq
+        atomic_write_json(self.snapshot_file, snapshot)
+        self.backup_policy.maybe_backup()
+
+        # El snapshot ya contiene todo lo registrado en el journal
+        open(self.journal_file, 'w').close()
+        self.pending = 0
+        self.offset = 0
+
+    def signature(self):
+        return file_signature(self.snapshot_file, self.journal_file)
+
+    def should_compact(self):
+        if self.pending < self.compact_every:
+            return False
+        snapshot, journal = (entry[1] if entry else 0 for entry in self.signature())
+        return journal >= self.compact_ratio * snapshot
+
+    def append_many(self, collection, records, data):
+        """Añade un lote al journal con una única escritura y un fsync.
+
+        `data` es el documento sin el lote; solo se usa si toca compactar.
+        """
+        lines = []
+        for seq, record in enumerate(records, self.seq + 1):
+            lines.append(json.dumps({
+                "seq": seq,
+                "op": "append",
+                "collection": collection,
+                "record": record
+            }, default=str))
+        if not lines:
+            return
+        append_lines(self.journal_file, lines)
+        self.seq += len(lines)
+        # Bajo el bloqueo y tras refresh_if_changed, lo escrito es el final del journal
+        self.offset = os.path.getsize(self.journal_file)
+
+        self.pending += len(lines)
+        if self.should_compact():
+            try:
+                self.save(with_records(data, collection, records))
+            except OSError as e:
+                # El lote ya está en el journal; se compactará en la siguiente alta
+                logger.warning("No se pudo compactar %s: %s", self.snapshot_file, e)
+
+    @staticmethod
+    def _apply(data, entry):
+        if entry["op"] == "append":
+            data.setdefault(entry["collection"], []).append(entry["record"])
+
+
+def create_storage(data_file, engine="journal", compact_every=500, compact_ratio=0.5,
+                   backup_enabled=False, backup_interval=24):
+    """Crea el motor de almacenamiento configurado en DATABASE_CONFIG"""
+    backup_policy = BackupPolicy(data_file, enabled=backup_enabled, interval_hours=backup_interval)
+    if engine == "json":
+        return JsonStorage(data_file, backup_policy=backup_policy)
+    if engine == "journal":
+        return JournalStorage(data_file, compact_every=compact_every, compact_ratio=compact_ratio,
+                              backup_policy=backup_policy)
+    if engine == "sqlite":
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage.from_json_file(data_file)
+    raise ValueError(f"Motor de almacenamiento desconocido: {engine}")
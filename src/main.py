@@ -3,16 +3,21 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date
-import json
-import os
+import random
+import sys
+from pathlib import Path
 
-# Configuración de la página
-st.set_page_config(
-    page_title="Fitness Assistant",
-    page_icon="💪",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Permitir importar config/ al ejecutar con `streamlit run src/main.py`
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.settings import (CATALOG_CONFIG, CHART_CONFIG, DATABASE_CONFIG, INSTRUMENTATION_CONFIG,
+                             LOGGING_CONFIG, MET_VALUES)
+from core import (DEFAULT_USER, WORKOUT_TYPES, DatabaseManager, MetModel, PlanGenerator, RoutineEngine,
+                  ShardIndex, bmi_category, calculate_bmi, ideal_weight, import_sessions, load_catalog,
+                  normalize_user_id, routine_volume)
+from core.downsampling import calorie_series
+from core.instrumentation import configure, metrics
+from core.plans import TRAINING_DAYS
 
 # CSS personalizado mejorado
 def create_custom_css():
@@ -229,68 +234,63 @@ def create_custom_css():
     </style>
     """
 
-# Clase para manejar datos (simulando base de datos)
-class DatabaseManager:
-    def __init__(self):
-        self.data_file = "fitness_data.json"
-        self.load_data()
-    
-    def load_data(self):
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    self.data = json.load(f)
-            else:
-                self.data = {
-                    "workouts": [],
-                    "progress": [],
-                    "user_profile": {}
-                }
-        except:
-            self.data = {
-                "workouts": [],
-                "progress": [],
-                "user_profile": {}
-            }
-    
-    def save_data(self):
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, default=str)
-        except Exception as e:
-            st.error(f"Error guardando datos: {e}")
-    
-    def add_workout(self, workout):
-        self.data["workouts"].append(workout)
-        self.save_data()
-    
-    def add_progress(self, progress):
-        self.data["progress"].append(progress)
-        self.save_data()
-    
-    def get_workouts(self):
-        return self.data["workouts"]
+@st.cache_resource
+def _configure_metrics():
+    # Una vez por proceso: solo INSTRUMENTATION_CONFIG activa todas las sesiones
+    return configure(
+        INSTRUMENTATION_CONFIG["enabled"],
+        log_file=LOGGING_CONFIG["file"],
+        level=LOGGING_CONFIG["level"],
+        fmt=LOGGING_CONFIG["format"],
+        samples=INSTRUMENTATION_CONFIG["samples"]
+    )
+
+def configure_instrumentation():
+    """?debug=1 mide solo esta sesión (hasta ?debug=0); no afecta a las demás"""
+    _configure_metrics()
+    if "debug" in st.query_params:
+        st.session_state.debug = st.query_params.get("debug") == "1"
+    # Cada rerun corre en el hilo de la sesión: se fija en cada ejecución
+    metrics.activate(st.session_state.get("debug", False))
+
+@st.cache_resource
+def get_calorie_table():
+    """Modelo MET compartido por el planificador y el recálculo del historial"""
+    return MetModel(MET_VALUES)
+
+@st.cache_resource
+def get_shard_index():
+    return ShardIndex(DATABASE_CONFIG["shards_dir"], legacy_file=DATABASE_CONFIG["legacy_file"])
+
+@st.cache_resource(max_entries=DATABASE_CONFIG["max_cached_users"])
+def _shared_database(user_id):
+    return DatabaseManager.from_config(get_shard_index().data_file(user_id), DATABASE_CONFIG)
+
+def get_database(user_id=None):
+    """DatabaseManager del usuario, compartido por el proceso; evita re-parsear el JSON en cada rerun"""
+    if user_id is None:
+        user_id = st.session_state.get("user_id", DEFAULT_USER)
+    db = _shared_database(user_id)
+    db.refresh_if_changed()
+    if db.last_error:
+        st.error(db.last_error)
+        db.last_error = None
+    return db
+
+def resolve_user():
+    """Identifica al usuario de la sesión (?user=... o campo de la barra lateral)"""
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = normalize_user_id(st.query_params.get("user", DEFAULT_USER))
     
-    def get_progress(self):
-        return self.data["progress"]
+    user_input = st.sidebar.text_input("👤 Usuario", value=st.session_state.user_id)
+    st.session_state.user_id = normalize_user_id(user_input)
+    return st.session_state.user_id
 
 # Calculadora de IMC
 class BMICalculator:
-    @staticmethod
-    def calculate_bmi(weight, height):
-        bmi = weight / (height ** 2)
-        return round(bmi, 2)
-    
-    @staticmethod
-    def get_bmi_category(bmi):
-        if bmi < 18.5:
-            return "Bajo peso", "🔵"
-        elif bmi < 25:
-            return "Peso normal", "🟢"
-        elif bmi < 30:
-            return "Sobrepeso", "🟡"
-        else:
-            return "Obesidad", "🔴"
+    # Los cálculos viven en core.bmi; se mantienen aquí por compatibilidad
+    calculate_bmi = staticmethod(calculate_bmi)
+    get_bmi_category = staticmethod(bmi_category)
     
     def render(self):
         st.subheader("📊 Calculadora de IMC")
@@ -316,143 +316,19 @@ class BMICalculator:
                 st.metric("Categoría", f"{emoji} {category}")
             
             with col3:
-                ideal_weight = 22 * (height ** 2)
-                st.metric("Peso ideal aprox.", f"{ideal_weight:.1f} kg")
+                st.metric("Peso ideal aprox.", f"{ideal_weight(height):.1f} kg")
 
 # Generador de rutinas
 class RoutineGenerator:
     def __init__(self):
-        self.exercises = {
-            "fuerza": {
-                "principiante": [
-                    {"name": "Sentadillas con peso corporal", "sets": "3x8-12", "desc": "Cuádriceps, glúteos, core"},
-                    {"name": "Flexiones en rodillas/pared", "sets": "3x6-10", "desc": "Pecho, tríceps, deltoides"},
-                    {"name": "Plancha estática", "sets": "3x20-30s", "desc": "Core, estabilidad"},
-                    {"name": "Puente de glúteos", "sets": "3x10-15", "desc": "Glúteos, isquiotibiales"},
-                    {"name": "Dead bug", "sets": "3x8 c/lado", "desc": "Core profundo, coordinación"},
-                    {"name": "Wall sits", "sets": "3x20-30s", "desc": "Cuádriceps, resistencia"},
-                    {"name": "Bird dog", "sets": "3x8 c/lado", "desc": "Core, espalda baja, equilibrio"}
-                ],
-                "intermedio": [
-                    {"name": "Sentadillas goblet", "sets": "4x10-15", "desc": "Cuádriceps, glúteos, core"},
-                    {"name": "Flexiones estándar", "sets": "4x8-15", "desc": "Pecho, tríceps, core"},
-                    {"name": "Peso muerto rumano (mancuernas)", "sets": "4x8-12", "desc": "Isquiotibiales, glúteos"},
-                    {"name": "Pike push-ups", "sets": "3x6-10", "desc": "Hombros, tríceps"},
-                    {"name": "Lunges walking", "sets": "3x12 c/pierna", "desc": "Cuádriceps, glúteos, equilibrio"},
-                    {"name": "Plancha con elevación de piernas", "sets": "3x8-10 c/lado", "desc": "Core, glúteos"},
-                    {"name": "Russian twists", "sets": "3x20-30", "desc": "Oblicuos, core rotacional"},
-                    {"name": "Inverted rows", "sets": "3x8-12", "desc": "Dorsales, romboides, bíceps"}
-                ],
-                "avanzado": [
-                    {"name": "Pistol squats asistidas", "sets": "4x5-8 c/pierna", "desc": "Fuerza unilateral, equilibrio"},
-                    {"name": "Archer push-ups", "sets": "4x6-10 c/lado", "desc": "Pecho unilateral, core"},
-                    {"name": "Handstand progression", "sets": "4x30-60s", "desc": "Hombros, core, equilibrio"},
-                    {"name": "Single-leg deadlifts", "sets": "4x8-10 c/pierna", "desc": "Isquiotibiales, glúteos, equilibrio"},
-                    {"name": "L-sit progression", "sets": "4x15-30s", "desc": "Core avanzado, flexores cadera"},
-                    {"name": "Muscle-ups progression", "sets": "3x3-6", "desc": "Tracción completa, transición"},
-                    {"name": "Human flag progression", "sets": "3x10-20s", "desc": "Core lateral, fuerza total"},
-                    {"name": "Planche progression", "sets": "4x15-30s", "desc": "Empuje avanzado, core"}
-                ]
-            },
-            "cardio": {
-                "principiante": [
-                    {"name": "Caminata moderada", "duration": "20-30 min", "intensity": "60-70% FC máx", "desc": "Base aeróbica, adaptación cardiovascular"},
-                    {"name": "Marcha en el lugar", "duration": "5-10 min", "intensity": "Baja", "desc": "Calentamiento, movilidad"},
-                    {"name": "Step-ups lentos", "duration": "3x2 min", "intensity": "Moderada", "desc": "Cardio de bajo impacto"},
-                    {"name": "Arm circles + marching", "duration": "10-15 min", "intensity": "Baja-Moderada", "desc": "Cardio sin impacto"},
-                    {"name": "Tai chi básico", "duration": "15-20 min", "intensity": "Baja", "desc": "Cardio meditativo, equilibrio"},
-                    {"name": "Swimming (si disponible)", "duration": "15-25 min", "intensity": "Moderada", "desc": "Cardio sin impacto, cuerpo completo"}
-                ],
-                "intermedio": [
-                    {"name": "HIIT básico (Tabata)", "duration": "16-20 min", "intensity": "85-95% FC máx", "desc": "Mejora VO2 máx, quema grasa"},
-                    {"name": "Circuit training", "duration": "25-35 min", "intensity": "70-85% FC máx", "desc": "Cardio + fuerza"},
-                    {"name": "Running intervals", "duration": "25-30 min", "intensity": "Variable", "desc": "Velocidad, resistencia"},
-                    {"name": "Burpees EMOM", "duration": "15-20 min", "intensity": "Alta", "desc": "Potencia, resistencia anaeróbica"},
-                    {"name": "Jump rope intervals", "duration": "20-25 min", "intensity": "Moderada-Alta", "desc": "Coordinación, cardio"},
-                    {"name": "Battle ropes", "duration": "15-20 min", "intensity": "Alta", "desc": "Potencia, core, cardio"}
-                ],
-                "avanzado": [
-                    {"name": "HIIT avanzado (Sprint intervals)", "duration": "30-40 min", "intensity": "90-100% FC máx", "desc": "Potencia aeróbica máxima"},
-                    {"name": "Tabata extremo", "duration": "20-32 min", "intensity": "Máxima", "desc": "Capacidad anaeróbica"},
-                    {"name": "CrossFit WODs", "duration": "15-45 min", "intensity": "Variable", "desc": "Fitness funcional"},
-                    {"name": "Spartan race training", "duration": "45-60 min", "intensity": "Alta", "desc": "Resistencia funcional"},
-                    {"name": "Boxing combinations", "duration": "30-45 min", "intensity": "Alta", "desc": "Potencia, coordinación"},
-                    {"name": "Metabolic circuits", "duration": "35-50 min", "intensity": "Very High", "desc": "EPOC máximo, quema calórica"}
-                ]
-            },
-            "flexibilidad": {
-                "principiante": [
-                    {"name": "Cat-cow stretches", "duration": "2x10", "type": "Dinámico", "desc": "Movilidad espinal"},
-                    {"name": "Hip circles", "duration": "10 c/dirección", "type": "Dinámico", "desc": "Movilidad cadera"},
-                    {"name": "Shoulder rolls", "duration": "10 adelante/atrás", "type": "Dinámico", "desc": "Movilidad hombros"},
-                    {"name": "Ankle circles", "duration": "10 c/pie", "type": "Dinámico", "desc": "Movilidad tobillo"},
-                    {"name": "Gentle spinal twists", "duration": "30s c/lado", "type": "Estático", "desc": "Flexibilidad espinal"},
-                    {"name": "Seated forward fold", "duration": "30-60s", "type": "Estático", "desc": "Isquiotibiales, espalda baja"},
-                    {"name": "Chest doorway stretch", "duration": "30s c/brazo", "type": "Estático", "desc": "Pectorales, hombros anteriores"}
-                ],
-                "intermedio": [
-                    {"name": "Dynamic warm-up sequence", "duration": "10-15 min", "type": "Dinámico", "desc": "Preparación completa"},
-                    {"name": "Yoga flow básico", "duration": "20-30 min", "type": "Flujo", "desc": "Flexibilidad, mindfulness"},
-                    {"name": "PNF stretching", "duration": "15-20 min", "type": "PNF", "desc": "Facilitación neuromuscular"},
-                    {"name": "Pigeon pose variations", "duration": "2-3 min c/lado", "type": "Estático profundo", "desc": "Flexores cadera, glúteos"},
-                    {"name": "Thoracic spine mobility", "duration": "10-15 min", "type": "Correctivo", "desc": "Postura, movilidad torácica"},
-                    {"name": "Deep hip flexor stretches", "duration": "90s c/lado", "type": "Estático", "desc": "Flexores cadera profundos"}
-                ],
-                "avanzado": [
-                    {"name": "Advanced yoga flows", "duration": "45-60 min", "type": "Vinyasa avanzado", "desc": "Flexibilidad extrema"},
-                    {"name": "Contortion training", "duration": "60-90 min", "type": "Especializado", "desc": "Hiperflexibilidad"},
-                    {"name": "Oversplits training", "duration": "30-45 min", "type": "Progresión extrema", "desc": "Flexibilidad máxima"},
-                    {"name": "Backbending intensive", "duration": "45-60 min", "type": "Especializado", "desc": "Extensión espinal extrema"},
-                    {"name": "Advanced PNF protocols", "duration": "30-45 min", "type": "PNF avanzado", "desc": "Técnicas neurofisiológicas"},
-                    {"name": "Martial arts flexibility", "duration": "60-75 min", "type": "Funcional avanzado", "desc": "Flexibilidad dinámica extrema"}
-                ]
-            }
-        }
+        # Catálogo compartido: se carga e indexa una sola vez por proceso
+        self.catalog = load_catalog(CATALOG_CONFIG["file_path"])
+        self.engine = RoutineEngine(self.catalog)
+        self.plan_generator = PlanGenerator(self.catalog)
     
-    def generate_routine(self, workout_type, level, duration):
-        exercises = self.exercises.get(workout_type, {}).get(level, [])
-        routine = []
-        
-        # Si no hay ejercicios, usar predeterminados
-        if not exercises:
-            exercises = [{"name": "Ejercicio básico", "sets": "3x10", "desc": "Movimiento general"}]
-        
-        if duration <= 15:
-            exercise_count = 3
-        elif duration <= 30:
-            exercise_count = 5
-        elif duration <= 45:
-            exercise_count = 7
-        else:
-            exercise_count = 8
-        
-        import random
-        selected = random.sample(exercises, min(exercise_count, len(exercises)))
-        
-        for exercise_data in selected:
-            if isinstance(exercise_data, dict):
-                # Nuevo formato con datos científicos
-                routine.append({
-                    "exercise": exercise_data["name"],
-                    "sets": exercise_data.get("sets", exercise_data.get("duration", "Ver descripción")),
-                    "description": exercise_data.get("desc", "Ejercicio funcional")
-                })
-            else:
-                # Formato legacy (string)
-                if workout_type == "fuerza":
-                    sets = "3 series x 10-15 reps"
-                elif workout_type == "cardio":
-                    sets = f"{duration//exercise_count} minutos"
-                else:
-                    sets = "30 segundos hold"
-                
-                routine.append({
-                    "exercise": exercise_data,
-                    "sets": sets,
-                    "description": "Ejercicio básico"
-                })
-        
-        return routine
+    def generate_routine(self, workout_type, level, duration, seed=None):
+        """Rutina que cabe en `duration` minutos; con la misma semilla sale la misma"""
+        return self.engine.generate(workout_type, level, duration, seed=seed)
     
     def render(self):
         st.subheader("🏋️‍♂️ Generador de Rutinas Científicas")
@@ -489,10 +365,18 @@ class RoutineGenerator:
         
         st.info(level_info[level])
         
+        seed = st.number_input("🎲 Semilla (0 = aleatoria)", min_value=0, max_value=2**31 - 1,
+                               value=0, step=1, help="Usa la misma semilla para repetir una rutina")
+        
         if st.button("🎯 Generar Rutina Científica"):
-            routine = self.generate_routine(workout_type, level, duration)
+            seed = int(seed) or random.randint(1, 2**31 - 1)
+            routine = self.generate_routine(workout_type, level, duration, seed=seed)
+            total_minutes = sum(exercise["minutes"] for exercise in routine)
+            volume = routine_volume(routine, workout_type)
             
             st.success(f"🔬 Rutina de {workout_type.upper()} - {level.upper()} ({duration} min)")
+            st.caption(f"⏱️ Tiempo estimado: {total_minutes:.0f} min · "
+                       f"💪 Volumen: {volume['sets']} series / {volume['reps']:.0f} reps · 🎲 Semilla: {seed}")
             st.markdown("### 📋 Tu Rutina Personalizada")
             
             # Mostrar ejercicios con información científica
@@ -503,6 +387,7 @@ class RoutineGenerator:
                     with col1:
                         st.markdown(f"#### {i}. {exercise['exercise']}")
                         st.write(f"**📊 Sets/Tiempo:** {exercise['sets']}")
+                        st.caption(f"⏱️ ~{exercise['minutes']} min")
                         
                     with col2:
                         st.write(f"**🎯 Músculos:** {exercise.get('description', 'Funcional')}")
@@ -541,49 +426,99 @@ class RoutineGenerator:
             st.info(recommendations[workout_type][level])
             
             # Guardar rutina con clave única
-            save_key = f"save_routine_{workout_type}_{level}_{duration}_{len(routine)}"
+            save_key = f"save_routine_{workout_type}_{level}_{duration}_{seed}"
             if st.button("💾 Guardar Rutina Científica", key=save_key):
-                db = DatabaseManager()
+                db = get_database()
                 workout = {
                     "date": datetime.now().isoformat(),
                     "type": workout_type,
                     "level": level,
                     "duration": duration,
                     "exercises": routine,
+                    "seed": seed,
                     "scientific_basis": True
                 }
-                db.add_workout(workout)
-                st.success("✅ Rutina científica guardada con éxito!")
-                st.balloons()
+                try:
+                    db.add_workout(workout)
+                except (OSError, ValueError) as e:
+                    st.error(f"❌ No se pudo guardar la rutina: {e}")
+                else:
+                    st.success("✅ Rutina científica guardada con éxito!")
+                    st.balloons()
+        
+        st.markdown("---")
+        self.render_weekly_plan()
+    
+    def render_weekly_plan(self):
+        """Plan de varias semanas periodizado que respeta la recuperación muscular"""
+        st.markdown("### 📅 Plan de Entrenamiento Semanal")
+        st.caption("Mesociclos de 4 semanas (base, carga, intensificación y descarga) "
+                   "respetando 48-72h de recuperación por grupo muscular")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            level = st.selectbox("Nivel del plan", ["principiante", "intermedio", "avanzado"], key="plan_level")
+        
+        with col2:
+            days_per_week = st.selectbox("Días por semana", sorted(TRAINING_DAYS), index=1, key="plan_days")
+        
+        with col3:
+            weeks = st.slider("Semanas", 1, 12, 4, key="plan_weeks")
+        
+        with col4:
+            duration = st.slider("Minutos por sesión", 20, 90, 45, step=5, key="plan_duration")
+        
+        if st.button("📅 Generar Plan Semanal"):
+            seed = random.randint(1, 2**31 - 1)
+            plan = self.plan_generator.generate(level, days_per_week, weeks, duration, seed=seed)
+            st.caption(f"🎲 Semilla: {seed}")
+            
+            for week in range(1, weeks + 1):
+                sessions = [s for s in plan["sessions"] if s["week"] == week]
+                with st.expander(f"Semana {week} · {sessions[0]['phase']}", expanded=week == 1):
+                    for session in sessions:
+                        focus = ", ".join(
+                            self.catalog.muscle_groups[g]["name"] for g in session["focus"]
+                        ) or "Flexibilidad y recuperación"
+                        st.markdown(f"**{session['weekday']}** · {focus} · ~{session['minutes']:.0f} min")
+                        st.dataframe(
+                            pd.DataFrame(session["exercises"])[["exercise", "sets", "minutes"]].rename(
+                                columns={"exercise": "Ejercicio", "sets": "Series", "minutes": "Minutos"}
+                            ),
+                            hide_index=True,
+                            use_container_width=True
+                        )
 
 # Planificador de cardio
 class CardioPlanner:
     def render(self):
         st.subheader("🏃‍♂️ Planificador de Cardio")
         
+        model = get_calorie_table()
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            activity = st.selectbox("Actividad", 
-                                  ["Caminar", "Trotar", "Correr", "Ciclismo", "Natación"])
+            activity = st.selectbox("Actividad", model.activities)
             duration = st.number_input("Duración (minutos)", 10, 180, 30)
         
         with col2:
-            intensity = st.selectbox("Intensidad", ["Baja", "Moderada", "Alta"])
+            intensity = st.selectbox("Intensidad", model.intensities)
             weight = st.number_input("Tu peso (kg)", 50, 150, 70)
         
-        # Cálculo aproximado de calorías
-        calories_per_min = {
-            "Caminar": {"Baja": 3, "Moderada": 4, "Alta": 5},
-            "Trotar": {"Baja": 6, "Moderada": 8, "Alta": 10},
-            "Correr": {"Baja": 8, "Moderada": 11, "Alta": 14},
-            "Ciclismo": {"Baja": 4, "Moderada": 6, "Alta": 9},
-            "Natación": {"Baja": 6, "Moderada": 8, "Alta": 11}
-        }
+        with st.expander("⚙️ Ajustar por edad y sexo (opcional)"):
+            sex_label = st.radio("Sexo", ["No indicar", "Hombre", "Mujer"], horizontal=True)
+            age = st.number_input("Edad", 14, 99, 30)
+            height = st.number_input("Altura (cm)", 130, 220, 170)
+        sex = {"Hombre": "M", "Mujer": "F"}.get(sex_label)
+        if sex is None:
+            age = height = None
         
-        estimated_calories = calories_per_min[activity][intensity] * duration * (weight/70)
+        # Gasto por METs: lectura de la rejilla peso × duración precalculada
+        estimated_calories = model.estimate(activity, intensity, duration, weight, age=age, sex=sex, height=height)
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("Calorías estimadas", f"{estimated_calories:.0f}")
@@ -594,394 +529,47 @@ class CardioPlanner:
         with col3:
             st.metric("Intensidad", intensity)
         
+        with col4:
+            st.metric("MET", f"{model.met(activity, intensity):.1f}")
+        
+        # Curva calorías/duración para cada intensidad con el peso actual
+        with metrics.timed("chart.cardio_curve"):
+            curves = []
+            for level in model.intensities:
+                minutes, kcal = model.duration_curve(activity, level, weight)
+                curves.append(pd.DataFrame({"Minutos": minutes, "Calorías": kcal, "Intensidad": level}))
+            fig = px.line(pd.concat(curves), x="Minutos", y="Calorías", color="Intensidad",
+                          title=f"Calorías según duración · {activity} ({weight} kg)")
+            fig.add_vline(x=duration, line_dash="dot")
+        st.plotly_chart(fig, use_container_width=True)
+        
         if st.button("Registrar Sesión de Cardio"):
-            db = DatabaseManager()
+            db = get_database()
             cardio_session = {
                 "date": datetime.now().isoformat(),
                 "activity": activity,
                 "duration": duration,
                 "intensity": intensity,
+                "weight": weight,
+                "age": age,
+                "sex": sex,
+                "height": height,
                 "calories": estimated_calories
             }
-            db.add_progress(cardio_session)
-            st.success("Sesión de cardio registrada!")
+            try:
+                db.add_progress(cardio_session)
+            except (OSError, ValueError) as e:
+                st.error(f"❌ No se pudo registrar la sesión: {e}")
+            else:
+                st.success("Sesión de cardio registrada!")
 
 # Anatomía muscular y ejercicios específicos
 class MuscleAnatomy:
+    DIFFICULTIES = ["Principiante", "Intermedio", "Avanzado"]
+    
     def __init__(self):
-        self.muscle_groups = {
-            "biceps": {
-                "name": "💪 Bíceps",
-                "description": "Músculos flexores del brazo",
-                "emoji": "💪",
-                "color": "#e74c3c",
-                "exercises": [
-                    {
-                        "name": "Curl con Mancuernas",
-                        "sets": "4x8-12",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas",
-                        "description": "Ejercicio clásico para el desarrollo del bíceps braquial",
-                        "tips": "Mantén los codos fijos, controla la fase excéntrica",
-                        "muscles": "Bíceps braquial, braquial anterior"
-                    },
-                    {
-                        "name": "Curl Martillo",
-                        "sets": "3x10-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas",
-                        "description": "Fortalece bíceps y antebrazos con agarre neutro",
-                        "tips": "Agarre neutro, movimiento controlado",
-                        "muscles": "Bíceps, braquioradial, braquial anterior"
-                    },
-                    {
-                        "name": "Curl en Barra",
-                        "sets": "4x6-10",
-                        "difficulty": "Intermedio",
-                        "equipment": "Barra",
-                        "description": "Permite mayor carga para desarrollo de fuerza",
-                        "tips": "Postura estable, evita balanceo",
-                        "muscles": "Bíceps braquial, músculos auxiliares"
-                    },
-                    {
-                        "name": "Curl Concentrado",
-                        "sets": "3x8-12",
-                        "difficulty": "Intermedio",
-                        "equipment": "Mancuerna",
-                        "description": "Aislamiento puro del bíceps",
-                        "tips": "Apoyo completo del brazo, contracción máxima",
-                        "muscles": "Bíceps braquial (aislado)"
-                    },
-                    {
-                        "name": "Curl 21s",
-                        "sets": "3x21",
-                        "difficulty": "Avanzado",
-                        "equipment": "Mancuernas/Barra",
-                        "description": "Técnica avanzada: 7 reps parciales + 7 parciales + 7 completas",
-                        "tips": "7 reps mitad inferior + 7 mitad superior + 7 completas",
-                        "muscles": "Bíceps braquial, resistencia muscular"
-                    }
-                ]
-            },
-            "triceps": {
-                "name": "💥 Tríceps",
-                "description": "Músculos extensores del brazo",
-                "emoji": "💥",
-                "color": "#9b59b6",
-                "exercises": [
-                    {
-                        "name": "Extensiones Tumbado (Skull Crushers)",
-                        "sets": "4x8-12",
-                        "difficulty": "Principiante",
-                        "equipment": "Barra/Mancuernas",
-                        "description": "Aislamiento efectivo de tríceps",
-                        "tips": "Codos fijos, movimiento solo de antebrazos",
-                        "muscles": "Tríceps braquial (3 cabezas)"
-                    },
-                    {
-                        "name": "Press Francés",
-                        "sets": "3x10-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas",
-                        "description": "Desarrollo de la cabeza larga del tríceps",
-                        "tips": "Brazos verticales, rango completo de movimiento",
-                        "muscles": "Tríceps braquial, énfasis en cabeza larga"
-                    },
-                    {
-                        "name": "Fondos en Paralelas",
-                        "sets": "4x6-12",
-                        "difficulty": "Intermedio",
-                        "equipment": "Paralelas",
-                        "description": "Ejercicio compuesto para tríceps y pecho",
-                        "tips": "Torso ligeramente inclinado, descenso controlado",
-                        "muscles": "Tríceps, pectoral inferior, deltoides anterior"
-                    },
-                    {
-                        "name": "Press de Banca Agarre Cerrado",
-                        "sets": "4x6-10",
-                        "difficulty": "Intermedio",
-                        "equipment": "Barra",
-                        "description": "Desarrollo de fuerza funcional de tríceps",
-                        "tips": "Agarre separación de hombros, codos cerca del cuerpo",
-                        "muscles": "Tríceps, pectoral interior, deltoides anterior"
-                    },
-                    {
-                        "name": "Diamond Push-ups",
-                        "sets": "3x5-15",
-                        "difficulty": "Avanzado",
-                        "equipment": "Peso corporal",
-                        "description": "Variación avanzada de flexiones para tríceps",
-                        "tips": "Manos forman diamante, codos cerca del cuerpo",
-                        "muscles": "Tríceps braquial, core, pectoral"
-                    }
-                ]
-            },
-            "chest": {
-                "name": "🏋️‍♂️ Pecho",
-                "description": "Músculos pectorales",
-                "emoji": "🏋️‍♂️",
-                "color": "#3498db",
-                "exercises": [
-                    {
-                        "name": "Press de Banca Plano",
-                        "sets": "4x6-10",
-                        "difficulty": "Principiante",
-                        "equipment": "Barra/Mancuernas",
-                        "description": "Rey de ejercicios para desarrollo de pecho",
-                        "tips": "Retracción escapular, pies firmes en el suelo",
-                        "muscles": "Pectoral mayor, deltoides anterior, tríceps"
-                    },
-                    {
-                        "name": "Press Inclinado",
-                        "sets": "4x8-12",
-                        "difficulty": "Principiante",
-                        "equipment": "Barra/Mancuernas",
-                        "description": "Desarrollo del pectoral superior",
-                        "tips": "Inclinación 30-45°, trayectoria hacia el mentón",
-                        "muscles": "Pectoral superior, deltoides anterior"
-                    },
-                    {
-                        "name": "Aperturas con Mancuernas",
-                        "sets": "3x10-15",
-                        "difficulty": "Intermedio",
-                        "equipment": "Mancuernas",
-                        "description": "Aislamiento y estiramiento del pectoral",
-                        "tips": "Codos ligeramente flexionados, arco amplio",
-                        "muscles": "Pectoral mayor (aislado)"
-                    },
-                    {
-                        "name": "Flexiones Tradicionales",
-                        "sets": "4x8-20",
-                        "difficulty": "Principiante",
-                        "equipment": "Peso corporal",
-                        "description": "Ejercicio funcional básico",
-                        "tips": "Cuerpo rígido, manos separación de hombros",
-                        "muscles": "Pectoral, tríceps, core, deltoides"
-                    },
-                    {
-                        "name": "Fondos en Paralelas (Pecho)",
-                        "sets": "3x6-12",
-                        "difficulty": "Avanzado",
-                        "equipment": "Paralelas",
-                        "description": "Inclinación hacia adelante para énfasis en pecho",
-                        "tips": "Torso inclinado 45°, descenso profundo",
-                        "muscles": "Pectoral inferior, tríceps, deltoides"
-                    }
-                ]
-            },
-            "back": {
-                "name": "🦅 Espalda",
-                "description": "Músculos dorsales y romboides",
-                "emoji": "🦅",
-                "color": "#27ae60",
-                "exercises": [
-                    {
-                        "name": "Dominadas/Pull-ups",
-                        "sets": "4x5-12",
-                        "difficulty": "Intermedio",
-                        "equipment": "Barra fija",
-                        "description": "Mejor ejercicio para desarrollo de espalda",
-                        "tips": "Retracción escapular, pecho hacia la barra",
-                        "muscles": "Dorsales, romboides, bíceps, core"
-                    },
-                    {
-                        "name": "Remo con Barra",
-                        "sets": "4x6-10",
-                        "difficulty": "Principiante",
-                        "equipment": "Barra",
-                        "description": "Desarrollo de grosor de espalda",
-                        "tips": "Torso inclinado 45°, barra hacia abdomen bajo",
-                        "muscles": "Dorsales, romboides, trapecio medio"
-                    },
-                    {
-                        "name": "Remo con Mancuernas",
-                        "sets": "4x8-12",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuerna",
-                        "description": "Trabajo unilateral para corrección de desequilibrios",
-                        "tips": "Apoyo en banco, codo cerca del cuerpo",
-                        "muscles": "Dorsal ancho, romboides, trapecio"
-                    },
-                    {
-                        "name": "Jalones al Pecho",
-                        "sets": "4x8-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Máquina de poleas",
-                        "description": "Alternativa a dominadas para principiantes",
-                        "tips": "Torso recto, barra hacia pecho superior",
-                        "muscles": "Dorsales, bíceps, romboides"
-                    },
-                    {
-                        "name": "Peso Muerto",
-                        "sets": "4x5-8",
-                        "difficulty": "Avanzado",
-                        "equipment": "Barra",
-                        "description": "Ejercicio compuesto para toda la cadena posterior",
-                        "tips": "Espalda neutra, cadera hacia atrás",
-                        "muscles": "Erector espinal, glúteos, isquiotibiales, trapecios"
-                    }
-                ]
-            },
-            "shoulders": {
-                "name": "🤸‍♀️ Hombros",
-                "description": "Músculos deltoides",
-                "emoji": "🤸‍♀️",
-                "color": "#f39c12",
-                "exercises": [
-                    {
-                        "name": "Press Militar",
-                        "sets": "4x6-10",
-                        "difficulty": "Intermedio",
-                        "equipment": "Barra",
-                        "description": "Desarrollo integral de hombros",
-                        "tips": "Core activado, trayectoria recta",
-                        "muscles": "Deltoides, tríceps, core"
-                    },
-                    {
-                        "name": "Elevaciones Laterales",
-                        "sets": "4x10-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas",
-                        "description": "Aislamiento del deltoides medio",
-                        "tips": "Codos ligeramente flexionados, control en bajada",
-                        "muscles": "Deltoides medio (aislado)"
-                    },
-                    {
-                        "name": "Elevaciones Frontales",
-                        "sets": "3x10-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas/Disco",
-                        "description": "Trabajo del deltoides anterior",
-                        "tips": "Movimiento controlado, hasta altura de hombros",
-                        "muscles": "Deltoides anterior"
-                    },
-                    {
-                        "name": "Pájaros (Deltoides Posterior)",
-                        "sets": "4x12-20",
-                        "difficulty": "Principiante",
-                        "equipment": "Mancuernas",
-                        "description": "Fortalecimiento del deltoides posterior",
-                        "tips": "Torso inclinado, pellizcar omóplatos",
-                        "muscles": "Deltoides posterior, romboides"
-                    },
-                    {
-                        "name": "Pike Push-ups",
-                        "sets": "3x8-15",
-                        "difficulty": "Avanzado",
-                        "equipment": "Peso corporal",
-                        "description": "Progresión hacia handstand push-ups",
-                        "tips": "Posición de V invertida, cabeza hacia el suelo",
-                        "muscles": "Deltoides, tríceps, core"
-                    }
-                ]
-            },
-            "legs": {
-                "name": "🦵 Piernas",
-                "description": "Cuádriceps, isquiotibiales y glúteos",
-                "emoji": "🦵",
-                "color": "#e67e22",
-                "exercises": [
-                    {
-                        "name": "Sentadillas",
-                        "sets": "4x8-15",
-                        "difficulty": "Principiante",
-                        "equipment": "Peso corporal/Barra",
-                        "description": "Rey de ejercicios para piernas",
-                        "tips": "Cadera hacia atrás, rodillas alineadas",
-                        "muscles": "Cuádriceps, glúteos, core"
-                    },
-                    {
-                        "name": "Peso Muerto Rumano",
-                        "sets": "4x8-12",
-                        "difficulty": "Intermedio",
-                        "equipment": "Barra/Mancuernas",
-                        "description": "Desarrollo de isquiotibiales y glúteos",
-                        "tips": "Cadera hacia atrás, espalda recta",
-                        "muscles": "Isquiotibiales, glúteos, erector espinal"
-                    },
-                    {
-                        "name": "Zancadas/Lunges",
-                        "sets": "3x10-15 c/pierna",
-                        "difficulty": "Principiante",
-                        "equipment": "Peso corporal/Mancuernas",
-                        "description": "Trabajo unilateral y funcional",
-                        "tips": "Paso largo, rodilla trasera casi toca el suelo",
-                        "muscles": "Cuádriceps, glúteos, equilibrio"
-                    },
-                    {
-                        "name": "Hip Thrust",
-                        "sets": "4x10-20",
-                        "difficulty": "Principiante",
-                        "equipment": "Banco/Barra",
-                        "description": "Mejor ejercicio para desarrollo de glúteos",
-                        "tips": "Contracción máxima arriba, barbilla al pecho",
-                        "muscles": "Glúteo mayor, isquiotibiales"
-                    },
-                    {
-                        "name": "Pistol Squats",
-                        "sets": "3x3-8 c/pierna",
-                        "difficulty": "Avanzado",
-                        "equipment": "Peso corporal",
-                        "description": "Sentadilla unilateral avanzada",
-                        "tips": "Flexibilidad de tobillo, fuerza unilateral",
-                        "muscles": "Cuádriceps, glúteos, core, equilibrio"
-                    }
-                ]
-            },
-            "abs": {
-                "name": "🔥 Abdominales",
-                "description": "Músculos del core",
-                "emoji": "🔥",
-                "color": "#e74c3c",
-                "exercises": [
-                    {
-                        "name": "Plancha",
-                        "sets": "4x30-60s",
-                        "difficulty": "Principiante",
-                        "equipment": "Peso corporal",
-                        "description": "Isométrico fundamental para core",
-                        "tips": "Cuerpo rígido como tabla, respiración continua",
-                        "muscles": "Recto abdominal, transverso, oblicuos"
-                    },
-                    {
-                        "name": "Crunch Abdominal",
-                        "sets": "4x15-25",
-                        "difficulty": "Principiante",
-                        "equipment": "Peso corporal",
-                        "description": "Flexión de tronco básica",
-                        "tips": "Movimiento corto, contracción en la subida",
-                        "muscles": "Recto abdominal superior"
-                    },
-                    {
-                        "name": "Mountain Climbers",
-                        "sets": "4x20-40",
-                        "difficulty": "Intermedio",
-                        "equipment": "Peso corporal",
-                        "description": "Ejercicio dinámico de core y cardio",
-                        "tips": "Posición de plancha, alternar piernas rápido",
-                        "muscles": "Core completo, cardio"
-                    },
-                    {
-                        "name": "Russian Twists",
-                        "sets": "4x20-40",
-                        "difficulty": "Intermedio",
-                        "equipment": "Peso corporal/Disco",
-                        "description": "Rotación de core para oblicuos",
-                        "tips": "Torso inclinado, pies elevados",
-                        "muscles": "Oblicuos, recto abdominal"
-                    },
-                    {
-                        "name": "L-Sit",
-                        "sets": "4x10-30s",
-                        "difficulty": "Avanzado",
-                        "equipment": "Paralelas/Suelo",
-                        "description": "Isométrico avanzado de core",
-                        "tips": "Piernas extendidas paralelas al suelo",
-                        "muscles": "Core completo, flexores de cadera"
-                    }
-                ]
-            }
-        }
+        self.catalog = load_catalog(CATALOG_CONFIG["file_path"])
+        self.muscle_groups = self.catalog.muscle_groups
     
     def render(self):
         st.subheader("🏃‍♀️ Anatomía Muscular & Ejercicios")
@@ -992,6 +580,12 @@ class MuscleAnatomy:
         Cada sección incluye ejercicios categorizados por nivel de dificultad con información científica detallada.
         """)
         
+        # Búsqueda en todo el catálogo (rutinas y grupos musculares)
+        query = st.text_input("🔍 Buscar ejercicios", placeholder="Ej: biceps, sentadilla, core...")
+        if query:
+            self.show_search_results(query)
+            st.markdown("---")
+        
         # Layout en grid para los grupos musculares
         muscle_names = list(self.muscle_groups.keys())
         
@@ -1020,7 +614,7 @@ class MuscleAnatomy:
                         if st.button(f"Ver Ejercicios {muscle['emoji']}", 
                                    key=f"btn_{muscle_key}",
                                    use_container_width=True):
-                            self.show_muscle_exercises(muscle_key)
+                            st.session_state.selected_muscle = muscle_key
             
             # Segunda columna
             if i + 1 < len(muscle_names):
@@ -1040,7 +634,40 @@ class MuscleAnatomy:
                         if st.button(f"Ver Ejercicios {muscle['emoji']}", 
                                    key=f"btn_{muscle_key}",
                                    use_container_width=True):
-                            self.show_muscle_exercises(muscle_key)
+                            st.session_state.selected_muscle = muscle_key
+        
+        # El grupo elegido se guarda en session_state para que los filtros
+        # sigan mostrándolo en los reruns que provoca cada interacción
+        selected_muscle = st.session_state.get("selected_muscle")
+        if selected_muscle in self.muscle_groups:
+            self.show_muscle_exercises(selected_muscle)
+    
+    def show_search_results(self, query):
+        """Muestra los ejercicios del catálogo que coinciden con la búsqueda"""
+        results = self.catalog.search(query, limit=10)
+        
+        if not results:
+            st.info(f"No se encontraron ejercicios para '{query}'")
+            return
+        
+        st.markdown(f"**{len(results)} resultados para '{query}'**")
+        
+        for exercise in results:
+            if exercise["muscle_group"]:
+                group = self.muscle_groups[exercise["muscle_group"]]["name"]
+            else:
+                group = f"Rutina de {exercise['type']}"
+            
+            with st.container():
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    st.markdown(f"#### {exercise['name']}")
+                    st.write(f"📝 {exercise['description']}")
+                
+                with col2:
+                    st.write(f"**{exercise['difficulty']}** · {group}")
+                    st.write(f"🏋️ {exercise['prescription']}")
     
     def show_muscle_exercises(self, muscle_key):
         """Muestra los ejercicios de un grupo muscular específico"""
@@ -1049,35 +676,46 @@ class MuscleAnatomy:
         st.markdown(f"## {muscle['emoji']} Ejercicios para {muscle['name']}")
         st.markdown(f"**{muscle['description']}**")
         
-        # Filtros
+        # Filtros facetados: cada opción muestra cuántos ejercicios quedarían
+        facets = self.catalog.facets
+        diff_key = f"diff_filter_{muscle_key}"
+        equip_key = f"equip_filter_{muscle_key}"
+        selections = {
+            "muscle_group": [muscle_key],
+            "difficulty": st.session_state.get(diff_key, []),
+            "equipment": st.session_state.get(equip_key, [])
+        }
+        difficulty_counts = facets.counts("difficulty", selections)
+        equipment_counts = facets.counts("equipment", selections)
+        equipment_options = sorted(
+            value for value, count in facets.counts("equipment", {"muscle_group": [muscle_key]}).items()
+            if count
+        )
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            difficulty_filter = st.selectbox(
+            selections["difficulty"] = st.multiselect(
                 "Filtrar por nivel:",
-                ["Todos", "Principiante", "Intermedio", "Avanzado"],
-                key=f"diff_filter_{muscle_key}"
+                self.DIFFICULTIES,
+                format_func=lambda value: f"{value} ({difficulty_counts.get(value, 0)})",
+                placeholder="Todos",
+                key=diff_key
             )
         
         with col2:
-            equipment_list = list(set([ex["equipment"] for ex in muscle["exercises"]]))
-            equipment_filter = st.selectbox(
+            selections["equipment"] = st.multiselect(
                 "Filtrar por equipamiento:",
-                ["Todos"] + equipment_list,
-                key=f"equip_filter_{muscle_key}"
+                equipment_options,
+                format_func=lambda value: f"{value} ({equipment_counts.get(value, 0)})",
+                placeholder="Todos",
+                key=equip_key
             )
         
         with col3:
             show_tips = st.checkbox("Mostrar tips avanzados", key=f"tips_{muscle_key}")
         
-        # Filtrar ejercicios
-        filtered_exercises = muscle["exercises"]
-        
-        if difficulty_filter != "Todos":
-            filtered_exercises = [ex for ex in filtered_exercises if ex["difficulty"] == difficulty_filter]
-        
-        if equipment_filter != "Todos":
-            filtered_exercises = [ex for ex in filtered_exercises if ex["equipment"] == equipment_filter]
+        filtered_exercises = facets.filter(selections)
         
         st.markdown(f"**{len(filtered_exercises)} ejercicios encontrados**")
         st.markdown("---")
@@ -1140,11 +778,12 @@ class MuscleAnatomy:
         
         # Botón para volver
         if st.button("⬅️ Volver a Anatomía Muscular", key=f"back_{muscle_key}"):
+            st.session_state.selected_muscle = None
             st.rerun()
     
     def add_to_custom_routine(self, exercise, muscle_group):
         """Añade un ejercicio a una rutina personalizada"""
-        db = DatabaseManager()
+        db = get_database()
         
         custom_workout = {
             "date": datetime.now().isoformat(),
@@ -1154,7 +793,11 @@ class MuscleAnatomy:
             "custom_routine": True
         }
         
-        db.add_workout(custom_workout)
+        try:
+            db.add_workout(custom_workout)
+        except (OSError, ValueError) as e:
+            st.error(f"❌ No se pudo añadir el ejercicio: {e}")
+            return
         st.success(f"✅ '{exercise['name']}' añadido a tu rutina personalizada!")
         st.balloons()
 
@@ -1190,43 +833,187 @@ class ScientificResources:
 
 # Seguimiento de progreso
 class ProgressTracker:
+    # Columnas visibles del historial de cada colección
+    HISTORY_COLUMNS = {
+        "progress": {"date": "Fecha", "activity": "Actividad", "intensity": "Intensidad",
+                     "duration": "Minutos", "calories": "Calorías"},
+        "workouts": {"date": "Fecha", "type": "Tipo", "level": "Nivel",
+                     "duration": "Minutos", "exercises": "Ejercicios"}
+    }
+    PAGE_SIZES = [25, 50, 100]
+    ORDERS = ["Descendente", "Ascendente"]
+    
     def render(self):
         st.subheader("📈 Seguimiento de Progreso")
         
-        db = DatabaseManager()
-        progress_data = db.get_progress()
-        workouts = db.get_workouts()
+        db = get_database()
+        totals = db.get_totals()
         
-        if not progress_data and not workouts:
+        if not totals["sessions"] and not totals["workouts"]:
             st.info("No hay datos de progreso aún. ¡Empieza a registrar tus entrenamientos!")
+            self.render_import(db)
             return
         
         # Métricas generales
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Entrenamientos totales", len(workouts))
+            st.metric("Entrenamientos totales", totals["workouts"])
         
         with col2:
-            total_calories = sum([p.get('calories', 0) for p in progress_data])
-            st.metric("Calorías quemadas", f"{total_calories:.0f}")
+            st.metric("Calorías quemadas", f"{totals['calories']:.0f}")
         
         with col3:
-            if progress_data:
-                avg_duration = sum([p.get('duration', 0) for p in progress_data]) / len(progress_data)
+            if totals["sessions"]:
+                avg_duration = totals["duration"] / totals["sessions"]
                 st.metric("Duración promedio", f"{avg_duration:.0f} min")
         
         # Gráficos
-        if progress_data:
-            df = pd.DataFrame(progress_data)
-            df['date'] = pd.to_datetime(df['date'])
+        if totals["sessions"]:
+            df = db.get_progress_frame()
+            
+            ranges = {
+                "Últimos 30 días": pd.Timedelta(days=30),
+                "Últimos 90 días": pd.Timedelta(days=90),
+                "Último año": pd.Timedelta(days=365),
+                "Todo el historial": None
+            }
+            range_label = st.selectbox("Rango del gráfico", list(ranges), index=3)
+            start = datetime.now() - ranges[range_label] if ranges[range_label] is not None else None
+            
+            # Se agregan/reducen los puntos en el servidor para acotar el payload de Plotly
+            with metrics.timed("chart.calories") as timing:
+                series, granularity = calorie_series(df, start=start, max_points=CHART_CONFIG["max_points"])
+                timing["points"] = len(series)
             
-            fig = px.line(df, x='date', y='calories', 
-                         title='Calorías Quemadas por Sesión')
-            st.plotly_chart(fig, use_container_width=True)
+            if series.empty:
+                st.info("No hay sesiones en el rango seleccionado.")
+            else:
+                title = ('Calorías Quemadas por Sesión' if granularity == "por sesión"
+                         else f'Calorías Quemadas ({granularity})')
+                fig = px.line(series, x='date', y='calories', title=title)
+                st.plotly_chart(fig, use_container_width=True)
+        
+        self.render_history(db)
+        self.render_import(db)
+        
+        if totals["sessions"]:
+            with st.expander("♻️ Recalcular calorías del historial"):
+                st.caption("Vuelve a estimar las calorías de todas las sesiones con el modelo MET "
+                           "(usa el peso, la edad y el sexo guardados en cada sesión; 70 kg si no hay peso)")
+                only_missing = st.checkbox("Solo sesiones sin calorías", value=False)
+                if st.button("♻️ Recalcular"):
+                    try:
+                        updated = db.recompute_calories(get_calorie_table(), only_missing=only_missing)
+                    except (OSError, ValueError) as e:
+                        st.error(f"❌ No se pudo guardar el recálculo: {e}")
+                    else:
+                        st.success(f"✅ {updated} sesiones actualizadas")
+
+    def render_history(self, db):
+        """Historial paginado: solo se consulta y se pinta la página visible"""
+        st.markdown("### 🗂️ Historial")
+        tab_sessions, tab_workouts = st.tabs(["🏃 Sesiones de cardio", "🏋️ Rutinas"])
+        
+        with tab_sessions:
+            activities = list(db.get_progress_frame()["activity"].cat.categories)
+            self.render_history_page(db, "progress", "activity", "Actividad", activities)
+        
+        with tab_workouts:
+            self.render_history_page(db, "workouts", "type", "Tipo", WORKOUT_TYPES + ["custom"])
+    
+    def render_history_page(self, db, collection, field, field_label, options):
+        columns = self.HISTORY_COLUMNS[collection]
+        # Cualquier columna visible salvo las listas (ejercicios)
+        sortable = [name for name in columns if name != "exercises"]
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 3, 1])
+        
+        with col1:
+            order_by = st.selectbox("Ordenar por", sortable, format_func=columns.get, key=f"{collection}_order_by")
+        
+        with col2:
+            order = st.selectbox("Orden", self.ORDERS, key=f"{collection}_order")
+        
+        with col3:
+            dates = st.date_input("Rango de fechas", value=(), key=f"{collection}_dates")
+        
+        with col4:
+            selected = st.multiselect(field_label, options, key=f"{collection}_filter")
+        
+        with col5:
+            size = st.selectbox("Por página", self.PAGE_SIZES, key=f"{collection}_size")
+        
+        start = dates[0] if len(dates) > 0 else None
+        end = dates[1] if len(dates) > 1 else start
+        
+        # Pila de cursores de las páginas visitadas; se reinicia al cambiar orden o filtros
+        params = (order_by, order, start, end, tuple(selected), size)
+        state = st.session_state.setdefault(f"history_{collection}", {"params": None, "cursors": [None]})
+        if state["params"] != params:
+            state["params"] = params
+            state["cursors"] = [None]
+        
+        records, next_cursor = db.query_page(
+            collection, limit=size, cursor=state["cursors"][-1], start=start, end=end,
+            descending=order == "Descendente", order_by=order_by, **{field: selected or None}
+        )
+        
+        if not records:
+            st.info("No hay registros con estos filtros.")
+            return
+        
+        page = pd.DataFrame.from_records(records, columns=list(columns))
+        page["date"] = page["date"].astype(str).str.slice(0, 16).str.replace("T", " ")
+        page = page.round({"duration": 1, "calories": 0})
+        if "exercises" in page:
+            page["exercises"] = page["exercises"].map(lambda e: len(e) if isinstance(e, list) else 0)
+        st.dataframe(page.rename(columns=columns), hide_index=True, use_container_width=True)
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            st.button("⬅️ Anterior", key=f"{collection}_prev", disabled=len(state["cursors"]) == 1,
+                      on_click=state["cursors"].pop)
+        
+        with col2:
+            st.caption(f"Página {len(state['cursors'])} · "
+                       f"{db.count(collection, start, end)} registros en el rango de fechas")
+        
+        with col3:
+            st.button("Siguiente ➡️", key=f"{collection}_next", disabled=next_cursor is None,
+                      on_click=state["cursors"].append, args=(next_cursor,))
+    
+    def render_import(self, db):
+        """Importación de exportaciones de wearables desde el disco local"""
+        with st.expander("📥 Importar sesiones (CSV, GPX, TCX)"):
+            st.caption("Ruta a un fichero o a una carpeta con exportaciones de tu reloj o app. "
+                       "Se leen en streaming y se guardan por lotes; las sesiones sin calorías "
+                       "se estiman con el modelo MET.")
+            path = st.text_input("Fichero o carpeta", key="import_path")
+            if st.button("📥 Importar", disabled=not path):
+                try:
+                    with st.spinner("Importando sesiones..."):
+                        stats = import_sessions(path, db.add_progress_many, model=get_calorie_table())
+                except (OSError, ValueError) as e:
+                    # Los lotes anteriores al fallo ya quedaron guardados
+                    st.error(f"❌ Importación interrumpida: {e}")
+                    return
+                st.success(f"✅ {stats['sessions']} sesiones importadas de {stats['files']} ficheros")
+                if stats["skipped"]:
+                    st.warning(f"⚠️ {stats['skipped']} sesiones sin fecha o duración se omitieron")
+                for error in stats["errors"]:
+                    st.error(f"❌ {error}")
 
 # Aplicación principal
 def main():
+    # Configuración de la página (aquí y no al importar: el módulo se puede importar sin Streamlit en marcha)
+    st.set_page_config(
+        page_title="Fitness Assistant",
+        page_icon="💪",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
     # CSS personalizado
     st.markdown(create_custom_css(), unsafe_allow_html=True)
     
@@ -1241,6 +1028,12 @@ def main():
     # Sidebar con navegación
     st.sidebar.title("Navegación")
     
+    # Instrumentación opcional: INSTRUMENTATION_CONFIG o ?debug=1 en la URL
+    configure_instrumentation()
+    
+    # Cada usuario trabaja sobre su propio shard de datos
+    resolve_user()
+    
     # Lista de páginas disponibles
     pages = [
         "Dashboard",
@@ -1266,6 +1059,26 @@ def main():
     # Renderizar páginas usando session_state
     current_page = st.session_state.current_page
     
+    with metrics.timed(f"page.{current_page}"):
+        render_page(current_page)
+    
+    render_debug_panel()
+
+def render_debug_panel():
+    """Panel de métricas en el sidebar (solo con la instrumentación activa)"""
+    if not metrics.active:
+        return
+    with st.sidebar.expander("🐞 Métricas de rendimiento"):
+        rows = metrics.summary()
+        if rows:
+            st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Aún no hay mediciones")
+        st.caption(f"📝 Log: {LOGGING_CONFIG['file']}")
+        if st.button("🧹 Reiniciar métricas", key="reset_metrics"):
+            metrics.reset()
+
+def render_page(current_page):
     if current_page == "Dashboard":
         st.write("¡Bienvenido a tu asistente fitness personal!")
         
@@ -1298,30 +1111,31 @@ def main():
         st.subheader("📈 Resumen Rápido")
         
         # Mostrar estadísticas básicas
-        db = DatabaseManager()
-        workouts = db.get_workouts()
-        progress = db.get_progress()
+        db = get_database()
+        totals = db.get_totals()
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Entrenamientos", len(workouts))
+            st.metric("Entrenamientos", totals["workouts"])
         
         with col2:
-            total_calories = sum([p.get('calories', 0) for p in progress])
-            st.metric("Calorías quemadas", f"{total_calories:.0f}")
+            st.metric("Calorías quemadas", f"{totals['calories']:.0f}")
         
         with col3:
-            if progress:
-                avg_duration = sum([p.get('duration', 0) for p in progress]) / len(progress)
+            if totals["sessions"]:
+                avg_duration = totals["duration"] / totals["sessions"]
                 st.metric("Duración promedio", f"{avg_duration:.0f} min")
             else:
                 st.metric("Duración promedio", "0 min")
         
         with col4:
-            this_week = len([w for w in workouts if w.get('date', '') > (datetime.now() - pd.Timedelta(days=7)).isoformat()])
+            this_week = db.get_recent_totals(days=7)["workouts"]
             st.metric("Esta semana", f"{this_week}")
         
+        if totals["sets"]:
+            st.caption(f"💪 Volumen acumulado en rutinas: {totals['sets']} series · {totals['reps']:.0f} repeticiones")
+        
         # Accesos rápidos adicionales
         st.markdown("---")
         st.subheader("🚀 Más Herramientas")